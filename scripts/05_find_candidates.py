@@ -13,21 +13,23 @@ def load_embeddings(filepath):
     """Load word embeddings from text file."""
     print(f"Loading embeddings from {filepath}...")
     words = []
-    vectors = []
     
     with open(filepath, 'r', encoding='utf-8') as f:
-        # Skip header line (vocab_size, dimension)
-        next(f)
+        # Header line (vocab_size, dimension) sizes the matrix up front;
+        # rows are parsed straight into it instead of into a list of arrays
+        vocab_size, dim = (int(x) for x in next(f).split()[:2])
+        vectors = np.empty((vocab_size, dim))
         for line in f:
             parts = line.strip().split()
             if len(parts) < 2:
                 continue
-            word = parts[0]
-            vector = np.array([float(x) for x in parts[1:]])
-            words.append(word)
-            vectors.append(vector)
+            if len(words) == vocab_size:
+                raise ValueError(f"{filepath} has more vectors than its header's {vocab_size}")
+            vectors[len(words)] = np.array(parts[1:], dtype=np.float64)
+            words.append(parts[0])
     
-    vectors = np.array(vectors)
+    # Drop the rows of skipped lines
+    vectors = vectors[:len(words)]
     word_to_idx = {w: i for i, w in enumerate(words)}
     
     print(f"Loaded {len(words)} words with {vectors.shape[1]} dimensions")
@@ -43,21 +45,25 @@ def load_dictionary(filepath):
                 pairs.add((parts[0], parts[1]))
     return pairs
 
-def csls(src_vec, tgt_vecs, k=10):
+def normalize_rows(vecs):
+    """L2-normalize each row."""
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+def csls(src_vecs, tgt_vecs_norm, k=10):
     """
     Cross-domain Similarity Local Scaling (CSLS).
     Better than cosine similarity for cross-lingual retrieval.
-    """
-    # Normalize vectors
-    src_vec = src_vec / np.linalg.norm(src_vec)
-    tgt_vecs_norm = tgt_vecs / np.linalg.norm(tgt_vecs, axis=1, keepdims=True)
     
+    src_vecs is a batch of normalized query rows and tgt_vecs_norm the
+    normalized target matrix; returns one row of scores per query.
+    """
     # Cosine similarities
-    similarities = np.dot(tgt_vecs_norm, src_vec)
+    similarities = np.dot(src_vecs, tgt_vecs_norm.T)
     
     # Get top-k for CSLS calculation
-    top_k_idx = np.argpartition(-similarities, min(k, len(similarities)-1))[:k]
-    mean_similarity = np.mean(similarities[top_k_idx])
+    kth = min(k, similarities.shape[1] - 1)
+    top_k_idx = np.argpartition(-similarities, kth, axis=1)[:, :k]
+    mean_similarity = np.take_along_axis(similarities, top_k_idx, axis=1).mean(axis=1, keepdims=True)
     
     # CSLS score
     csls_scores = 2 * similarities - mean_similarity
@@ -66,7 +72,7 @@ def csls(src_vec, tgt_vecs, k=10):
 
 def find_candidates(ido_words, ido_vecs, ido_to_idx,
                    epo_words, epo_vecs, epo_to_idx,
-                   existing_dict, threshold=0.7, k=10):
+                   existing_dict, threshold=0.7, k=10, batch_size=256):
     """Find translation candidates for unknown Ido words."""
     
     # Get unknown Ido words
@@ -76,41 +82,52 @@ def find_candidates(ido_words, ido_vecs, ido_to_idx,
     print(f"Finding candidates for {len(unknown_ido)} unknown Ido words...")
     print(f"Using threshold: {threshold}, k: {k}")
     
+    # Normalize both matrices once; each batch of queries is then one matmul
+    ido_norm = normalize_rows(ido_vecs)
+    epo_norm = normalize_rows(epo_vecs)
+    # Reverse top-k per Esperanto word, shared by all Ido words proposing it
+    reverse_top_k = {}
+    kth = min(k, len(epo_words) - 1)
+    
     candidates = []
     
-    for ido_word in tqdm(unknown_ido, desc="Processing"):
-        ido_idx = ido_to_idx[ido_word]
-        ido_vec = ido_vecs[ido_idx]
+    for start in tqdm(range(0, len(unknown_ido), batch_size), desc="Processing"):
+        batch_words = unknown_ido[start:start + batch_size]
+        batch_idx = [ido_to_idx[w] for w in batch_words]
         
         # Find nearest neighbors using CSLS
-        csls_scores = csls(ido_vec, epo_vecs, k=k)
-        
-        # Get top-k candidates
-        top_k_idx = np.argsort(-csls_scores)[:k]
+        batch_csls = csls(ido_norm[batch_idx], epo_norm, k=k)
         
-        for idx in top_k_idx:
-            similarity = csls_scores[idx]
-            
-            if similarity < threshold:
-                continue
-            
-            epo_word = epo_words[idx]
-            
-            # Check mutual nearest neighbor
-            reverse_csls = csls(epo_vecs[idx], ido_vecs, k=k)
-            reverse_top_k = np.argsort(-reverse_csls)[:k]
-            is_mutual = ido_idx in reverse_top_k
-            
-            # Calculate confidence
-            confidence = similarity + (0.1 if is_mutual else 0)
+        for ido_word, ido_idx, csls_scores in zip(batch_words, batch_idx, batch_csls):
+            # Get top-k candidates: partition out the k best, then sort only those
+            top_k_idx = np.argpartition(-csls_scores, kth)[:k]
+            top_k_idx = top_k_idx[np.argsort(-csls_scores[top_k_idx])]
             
-            candidates.append({
-                'ido': ido_word,
-                'epo': epo_word,
-                'similarity': float(similarity),
-                'mutual': is_mutual,
-                'confidence': float(confidence)
-            })
+            for idx in top_k_idx:
+                similarity = csls_scores[idx]
+                
+                if similarity < threshold:
+                    continue
+                
+                epo_word = epo_words[idx]
+                
+                # Check mutual nearest neighbor
+                if idx not in reverse_top_k:
+                    reverse_csls = csls(epo_norm[idx:idx + 1], ido_norm, k=k)[0]
+                    # Only membership matters here, so the k best stay unsorted
+                    reverse_top_k[idx] = np.argpartition(-reverse_csls, min(k, len(reverse_csls) - 1))[:k]
+                is_mutual = ido_idx in reverse_top_k[idx]
+                
+                # Calculate confidence
+                confidence = similarity + (0.1 if is_mutual else 0)
+                
+                candidates.append({
+                    'ido': ido_word,
+                    'epo': epo_word,
+                    'similarity': float(similarity),
+                    'mutual': is_mutual,
+                    'confidence': float(confidence)
+                })
     
     # Sort by confidence
     candidates.sort(key=lambda x: x['confidence'], reverse=True)
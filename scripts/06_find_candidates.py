@@ -18,7 +18,6 @@ import numpy as np
 from pathlib import Path
 from typing import Dict, List, Set
 from gensim.models import FastText
-from sklearn.metrics.pairwise import cosine_similarity
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -113,26 +112,15 @@ def find_nearest_neighbors(
     # Apply alignment
     v_aligned = (alignment_matrix @ v_ido.T).T
     
-    # Get all Esperanto embeddings
-    epo_vectors = epo_model.wv.vectors
-    
-    # Compute cosine similarities
-    similarities = cosine_similarity(v_aligned, epo_vectors)[0]
-    
-    # Get top k indices
-    top_k_indices = np.argsort(similarities)[-k:][::-1]
+    # Top k by cosine similarity; gensim normalizes the Esperanto vectors
+    # once per model and reuses them for every query
+    nearest = epo_model.wv.similar_by_vector(v_aligned[0], topn=k)
     
     # Build result list
-    results = []
-    for idx in top_k_indices:
-        epo_word = epo_model.wv.index_to_key[idx]
-        similarity = float(similarities[idx])
-        results.append({
-            'translation': epo_word,
-            'similarity': similarity
-        })
-    
-    return results
+    return [
+        {'translation': epo_word, 'similarity': float(similarity)}
+        for epo_word, similarity in nearest
+    ]
 
 
 def process_all_candidates(
@@ -40,8 +40,6 @@ def check_mutual_nearest_neighbor(
     k: int = 10
 ) -> bool:
     """Check if translation is mutual nearest neighbor."""
-    from sklearn.metrics.pairwise import cosine_similarity
-    
     # Check Esperanto -> Ido direction
     if epo_word not in epo_model.wv:
         return False
@@ -52,17 +50,11 @@ def check_mutual_nearest_neighbor(
     # Apply inverse alignment (transpose)
     v_aligned = (alignment_matrix.T @ v_epo.T).T
     
-    # Get all Ido embeddings
-    ido_vectors = ido_model.wv.vectors
-    
-    # Compute similarities
-    similarities = cosine_similarity(v_aligned, ido_vectors)[0]
-    
-    # Get top k
-    top_k_indices = np.argsort(similarities)[-k:][::-1]
-    top_k_words = [ido_model.wv.index_to_key[idx] for idx in top_k_indices]
+    # Top k Ido words by cosine similarity; gensim normalizes the Ido
+    # vectors once per model and reuses them for every check
+    nearest = ido_model.wv.similar_by_vector(v_aligned[0], topn=k)
     
-    return ido_word in top_k_words
+    return any(word == ido_word for word, _ in nearest)
 
 
 def compute_frequency_ratio(
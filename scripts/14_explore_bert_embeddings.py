@@ -82,6 +82,9 @@ def build_embedding_matrix(vocab, model, tokenizer, device, save_path=None):
     
     embedding_matrix = np.array(embeddings)
     
+    # Store normalized so cosine similarity is a plain dot product
+    embedding_matrix /= np.linalg.norm(embedding_matrix, axis=1, keepdims=True).clip(min=1e-8)
+    
     if save_path:
         print(f"Saving embeddings to {save_path}...")
         np.savez(save_path, embeddings=embedding_matrix, words=valid_words)
@@ -97,8 +100,9 @@ def find_nearest_neighbors(query_word, embedding_matrix, vocab, model, tokenizer
     # Compute similarities
     similarities = cosine_similarity(query_emb, embedding_matrix)[0]
     
-    # Get top K indices
-    top_indices = np.argsort(similarities)[::-1][:top_k]
+    # Get top K indices: partition out the k best, then sort only those
+    top_indices = np.argpartition(-similarities, min(top_k, len(similarities) - 1))[:top_k]
+    top_indices = top_indices[np.argsort(-similarities[top_indices])]
     
     # Return results
     results = []
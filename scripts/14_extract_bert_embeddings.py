@@ -9,6 +9,9 @@ Usage:
         --output models/ido_bert_embeddings.npy \
         --batch-size 32
 
+Add --token-cache-dir to reuse the tokenized vocabulary across runs.
+Add --int8 to run the encoder with dynamic int8 quantization (CPU only).
+
 Expected time: 15-30 minutes for 95K vocabulary
 """
 
@@ -21,6 +24,8 @@ from typing import List, Dict
 from transformers import XLMRobertaModel, XLMRobertaTokenizer
 from tqdm import tqdm
 
+from _pipeline import tokenize_vocabulary
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -39,12 +44,27 @@ def load_vocabulary(vocab_path: Path) -> List[str]:
     return words
 
 
+def quantize_int8(model):
+    """
+    Apply dynamic int8 quantization to all Linear layers.
+    
+    Only the pooled last_hidden_state is consumed and later compared by
+    cosine, so the small quantization noise is acceptable.
+    """
+    logger.info("Quantizing Linear layers to int8...")
+    model.eval()
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
 def extract_embeddings(
     model,
     tokenizer,
     words: List[str],
     batch_size: int = 32,
-    device: str = "cuda"
+    device: str = "cuda",
+    token_cache_dir: Path = None
 ) -> Dict[str, np.ndarray]:
     """
     Extract BERT embeddings for a list of words.
@@ -58,20 +78,21 @@ def extract_embeddings(
     model = model.to(device)
     model.eval()
     
+    input_ids, attention_mask = tokenize_vocabulary(tokenizer, words, token_cache_dir)
+    
     embeddings = {}
     
     with torch.no_grad():
         for i in tqdm(range(0, len(words), batch_size), desc="Extracting"):
             batch_words = words[i:i+batch_size]
             
-            # Tokenize batch
-            inputs = tokenizer(
-                batch_words,
-                padding=True,
-                truncation=True,
-                max_length=32,  # Words shouldn't be longer
-                return_tensors="pt"
-            ).to(device)
+            # Trim the pre-tokenized batch to its longest word
+            batch_mask = attention_mask[i:i+batch_size]
+            seq_len = int(batch_mask.sum(axis=1).max())
+            inputs = {
+                'input_ids': torch.from_numpy(input_ids[i:i+batch_size, :seq_len]).to(device),
+                'attention_mask': torch.from_numpy(batch_mask[:, :seq_len]).to(device)
+            }
             
             # Get embeddings
             outputs = model(**inputs)
@@ -102,12 +123,18 @@ def save_embeddings(
     output_path: Path,
     vocab_path: Path
 ):
-    """Save embeddings as numpy array with vocabulary file."""
+    """
+    Save embeddings as numpy array with vocabulary file.
+    
+    Rows are L2-normalized before saving, so cosine similarity on the
+    saved matrix is a plain dot product.
+    """
     logger.info(f"Saving embeddings to {output_path}")
     
     # Create embedding matrix
     words = list(embeddings.keys())
     matrix = np.array([embeddings[w] for w in words])
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-8)
     
     # Save
     np.save(output_path, matrix)
@@ -133,6 +160,10 @@ def main():
                         help='Output path for embeddings (.npy)')
     parser.add_argument('--batch-size', type=int, default=32,
                         help='Batch size (default: 32)')
+    parser.add_argument('--token-cache-dir', type=Path,
+                        help='Directory for cached tokenized vocabularies')
+    parser.add_argument('--int8', action='store_true',
+                        help='Quantize the encoder to int8 (CPU only)')
     
     args = parser.parse_args()
     
@@ -145,11 +176,20 @@ def main():
     model = XLMRobertaModel.from_pretrained(str(args.model))
     tokenizer = XLMRobertaTokenizer.from_pretrained(str(args.model))
     
+    if args.int8:
+        if device != "cpu":
+            logger.warning("int8 dynamic quantization is CPU-only, switching to CPU")
+            device = "cpu"
+        model = quantize_int8(model)
+    
     # Load vocabulary
     words = load_vocabulary(args.vocab)
     
     # Extract embeddings
-    embeddings = extract_embeddings(model, tokenizer, words, args.batch_size, device)
+    embeddings = extract_embeddings(
+        model, tokenizer, words, args.batch_size, device,
+        token_cache_dir=args.token_cache_dir
+    )
     
     # Save
     vocab_output = args.output.parent / f"{args.output.stem}_vocab.txt"
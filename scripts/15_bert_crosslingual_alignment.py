@@ -11,7 +11,9 @@ Steps:
 """
 
 import argparse
+import hashlib
 import json
+import os
 import numpy as np
 import torch
 from pathlib import Path
@@ -21,20 +23,43 @@ from scipy.spatial.distance import cdist
 from scipy.linalg import orthogonal_procrustes
 from gensim.models import Word2Vec
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import logging
 
+from _pipeline import tokenize_vocabulary
+
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Indel
+except ImportError:
+    rf_process = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-def load_model(model_path):
-    """Load fine-tuned BERT model."""
+def load_model(model_path, int8=False):
+    """
+    Load fine-tuned BERT model.
+    
+    With int8=True, all Linear layers are dynamically quantized to int8.
+    Dynamic quantization only runs on CPU, so the model stays on CPU.
+    """
     logger.info(f"Loading model from {model_path}...")
     tokenizer = XLMRobertaTokenizer.from_pretrained(model_path)
     model = XLMRobertaModel.from_pretrained(model_path)
     model.eval()
     
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    if int8:
+        if device.type != 'cpu':
+            logger.warning("int8 dynamic quantization is CPU-only, switching to CPU")
+            device = torch.device('cpu')
+        logger.info("Quantizing Linear layers to int8...")
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
     model = model.to(device)
     logger.info(f"Model loaded on {device}")
     
@@ -44,6 +69,11 @@ def load_model(model_path):
 def get_word_embedding(word, model, tokenizer, device):
     """Get embedding for a single word."""
     tokens = tokenizer(word, return_tensors='pt', add_special_tokens=True)
+    return embed_tokens(tokens, model, device)
+
+
+def embed_tokens(tokens, model, device):
+    """Get embedding for a single tokenized word."""
     tokens = {k: v.to(device) for k, v in tokens.items()}
     
     with torch.no_grad():
@@ -54,11 +84,21 @@ def get_word_embedding(word, model, tokenizer, device):
     return embeddings.cpu().numpy()
 
 
+def normalize_rows(matrix):
+    """L2-normalize each row, so cosine similarity becomes a dot product."""
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-8)
+
+
 def load_ido_embeddings(npz_path):
-    """Load pre-computed Ido embeddings."""
+    """
+    Load pre-computed Ido embeddings.
+    
+    Rows are returned L2-normalized. Files written by the extraction scripts
+    are already normalized; this also covers older, unnormalized caches.
+    """
     logger.info(f"Loading Ido embeddings from {npz_path}...")
     data = np.load(npz_path)
-    embeddings = data['embeddings']
+    embeddings = normalize_rows(data['embeddings'])
     words = data['words'].tolist()
     word_to_idx = {word: idx for idx, word in enumerate(words)}
     logger.info(f"Loaded {len(words):,} Ido words")
@@ -82,10 +122,77 @@ def load_esperanto_vocab(model_path=None, vocab_path=None, max_words=10000):
     return words
 
 
-def extract_esperanto_embeddings(epo_vocab, model, tokenizer, device, save_path=None):
-    """Extract Esperanto embeddings from fine-tuned BERT."""
+def build_cache_meta(epo_vocab, model_path, int8=False):
+    """
+    Describe what a cached Esperanto embedding file was built from.
+    
+    The model is fingerprinted by file names, sizes and mtimes rather than
+    by hashing the weights, which would take longer than a cache hit saves.
+    """
+    vocab_sha = hashlib.sha1("\n".join(epo_vocab).encode('utf-8')).hexdigest()
+    
+    model_hash = hashlib.sha1()
+    model_path = Path(model_path)
+    files = sorted(model_path.rglob('*')) if model_path.is_dir() else [model_path]
+    for file in files:
+        if file.is_file():
+            stat = file.stat()
+            entry = f"{file.relative_to(model_path.parent)}|{stat.st_size}|{stat.st_mtime_ns}\n"
+            model_hash.update(entry.encode('utf-8'))
+    
+    return {
+        'vocab_sha': vocab_sha,
+        'model_sha': model_hash.hexdigest(),
+        'int8': int8
+    }
+
+
+def cache_meta_path(npz_path):
+    """Path of the sidecar metadata file for a cached embedding file."""
+    return npz_path.with_name(npz_path.name + '.meta.json')
+
+
+def check_epo_cache(npz_path, expected_meta, dim):
+    """Return True if the cached Esperanto embeddings match expected_meta and dim."""
+    if not npz_path.exists():
+        logger.info(f"No cached Esperanto embeddings at {npz_path}")
+        return False
+    
+    meta_path = cache_meta_path(npz_path)
+    if not meta_path.exists():
+        logger.info(f"Cached embeddings have no {meta_path.name}, re-extracting")
+        return False
+    
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    
+    for key, value in expected_meta.items():
+        if meta.get(key) != value:
+            logger.info(f"Cached embeddings are stale ({key} changed), re-extracting")
+            return False
+    
+    if meta.get('dim') != dim:
+        logger.info(f"Cached embeddings have dim {meta.get('dim')}, expected {dim}, re-extracting")
+        return False
+    
+    return True
+
+
+def extract_esperanto_embeddings(epo_vocab, model, tokenizer, device, save_path=None,
+                                 token_cache_dir=None, meta=None):
+    """
+    Extract Esperanto embeddings from fine-tuned BERT.
+    
+    If meta is given, it is written next to save_path (plus the embedding
+    dim) so later runs can validate the cache with check_epo_cache.
+    """
     logger.info(f"\nExtracting Esperanto embeddings for {len(epo_vocab):,} words...")
     
+    # Truncate only at the model's own limit, as per-word tokenization did
+    input_ids, attention_mask = tokenize_vocabulary(
+        tokenizer, epo_vocab, token_cache_dir, max_length=tokenizer.model_max_length
+    )
+    
     embeddings = []
     valid_words = []
     
@@ -94,26 +201,166 @@ def extract_esperanto_embeddings(epo_vocab, model, tokenizer, device, save_path=
             logger.info(f"  Processed {i + 1:,}/{len(epo_vocab):,} words...")
         
         try:
-            emb = get_word_embedding(word, model, tokenizer, device)
+            # Strip the padding added by batch tokenization
+            length = int(attention_mask[i].sum())
+            tokens = {
+                'input_ids': torch.from_numpy(input_ids[i:i + 1, :length]),
+                'attention_mask': torch.from_numpy(attention_mask[i:i + 1, :length])
+            }
+            emb = embed_tokens(tokens, model, device)
             embeddings.append(emb)
             valid_words.append(word)
         except Exception as e:
             logger.warning(f"  Failed for '{word}': {e}")
     
-    embedding_matrix = np.array(embeddings)
+    # Store normalized so downstream cosine is a plain dot product
+    embedding_matrix = normalize_rows(np.array(embeddings))
     
     if save_path:
         logger.info(f"Saving Esperanto embeddings to {save_path}...")
         np.savez(save_path, embeddings=embedding_matrix, words=valid_words)
+        
+        if meta is not None:
+            meta = dict(meta, dim=int(embedding_matrix.shape[1]))
+            with open(cache_meta_path(Path(save_path)), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
     
     logger.info(f"✅ Extracted {len(valid_words):,} Esperanto embeddings")
     return embedding_matrix, valid_words
 
 
-def create_seed_dictionary(ido_words, epo_words, min_similarity=0.7, max_pairs=500):
+def _char_masks(word):
+    """Bit mask of the positions of each character of word."""
+    masks = {}
+    for i, c in enumerate(word):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return masks
+
+
+def _lcs_length(masks, len_a, b):
+    """
+    Longest common subsequence length of a word a and b, where masks is
+    _char_masks(a). Bit-parallel (Hyyroe), one big-int step per char of b.
+    """
+    v = (1 << len_a) - 1
+    for c in b:
+        u = v & masks.get(c, 0)
+        v = (v + u) | (v - u)
+    return len_a - bin(v & ((1 << len_a) - 1)).count('1')
+
+
+def indel_similarity(a, b):
+    """
+    Normalized Indel similarity: 1 - indel_distance / (len(a) + len(b)).
+    
+    Pure-Python equivalent of rapidfuzz.distance.Indel.normalized_similarity,
+    so cognate scores do not depend on whether rapidfuzz is installed.
+    """
+    lensum = len(a) + len(b)
+    if not lensum:
+        return 1.0
+    return 1.0 - (lensum - 2 * _lcs_length(_char_masks(a), len(a), b)) / lensum
+
+
+def _group_by_length(words):
+    """Map word length -> words of that length, in input order."""
+    by_len = {}
+    for word in words:
+        by_len.setdefault(len(word), []).append(word)
+    return by_len
+
+
+def _length_window(epo_by_len, length, max_len_diff):
+    """Esperanto words whose length is within max_len_diff of length."""
+    return [epo_word
+            for epo_len in range(length - max_len_diff, length + max_len_diff + 1)
+            for epo_word in epo_by_len.get(epo_len, ())]
+
+
+def _score_cognate_chunk(ido_chunk, epo_by_len, min_similarity, max_len_diff):
+    """Score one chunk of Ido words against the Esperanto words of similar length."""
+    scored = []
+    for ido_word in ido_chunk:
+        masks = _char_masks(ido_word)
+        n = len(ido_word)
+        for epo_word in _length_window(epo_by_len, n, max_len_diff):
+            lensum = n + len(epo_word)
+            similarity = 1.0 - (lensum - 2 * _lcs_length(masks, n, epo_word)) / lensum
+            if similarity >= min_similarity:
+                scored.append((similarity, ido_word, epo_word))
+    
+    return scored
+
+
+def score_cognate_pairs(ido_words, epo_words, min_similarity=0.7, max_len_diff=2,
+                        max_cells=1 << 22, workers=None):
+    """
+    Score Ido/Esperanto word pairs of similar length by string similarity.
+    
+    Returns (similarity, ido_word, epo_word) tuples with similarity >= min_similarity.
+    Similarity is the normalized Indel similarity (see indel_similarity),
+    computed by rapidfuzz's C scorer (threaded) when installed, otherwise in
+    pure Python over a process pool of `workers` processes (default: all
+    cores). Only pairs whose lengths differ by at most max_len_diff are
+    scored; rapidfuzz score matrices are kept to max_cells entries.
+    """
+    scored = []
+    if not ido_words or not epo_words:
+        return scored
+    
+    workers = workers or os.cpu_count() or 1
+    epo_by_len = _group_by_length(epo_words)
+    
+    if rf_process is not None:
+        # Score each Ido length group against the Esperanto words of similar
+        # length only, in row chunks of at most max_cells scores
+        ido_by_len = _group_by_length(ido_words)
+        for length, ido_group in tqdm(sorted(ido_by_len.items()), desc="Finding cognates"):
+            targets = _length_window(epo_by_len, length, max_len_diff)
+            if not targets:
+                continue
+            rows = max(1, max_cells // len(targets))
+            for start in range(0, len(ido_group), rows):
+                chunk = ido_group[start:start + rows]
+                scores = rf_process.cdist(
+                    chunk, targets,
+                    scorer=Indel.normalized_similarity,
+                    score_cutoff=min_similarity,
+                    dtype=np.float64,
+                    workers=workers
+                )
+                for i, j in zip(*(idx.tolist() for idx in np.nonzero(scores))):
+                    scored.append((float(scores[i, j]), chunk[i], targets[j]))
+    else:
+        # Several chunks per worker keep the pool balanced
+        pool_chunk = max(1, -(-len(ido_words) // (workers * 4)))
+        chunks = [ido_words[i:i + pool_chunk] for i in range(0, len(ido_words), pool_chunk)]
+        
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    _score_cognate_chunk, chunks,
+                    repeat(epo_by_len), repeat(min_similarity), repeat(max_len_diff)
+                )
+                for chunk_scored in tqdm(results, total=len(chunks), desc="Finding cognates"):
+                    scored.extend(chunk_scored)
+        else:
+            for chunk in tqdm(chunks, desc="Finding cognates"):
+                scored.extend(_score_cognate_chunk(chunk, epo_by_len, min_similarity, max_len_diff))
+    
+    return scored
+
+
+def create_seed_dictionary(ido_words, epo_words, min_similarity=0.7, max_pairs=500,
+                           workers=None):
     """
     Create seed dictionary by finding cognates (similar words).
     This works well for Ido↔Esperanto due to their shared vocabulary.
+    
+    Near matches are picked by greedy matching: all candidate pairs are
+    scored, then accepted in order of descending similarity as long as
+    neither word is already used. The result does not depend on set
+    iteration order.
     """
     logger.info(f"\nCreating seed dictionary (cognates)...")
     logger.info(f"Ido vocab: {len(ido_words):,}, Esperanto vocab: {len(epo_words):,}")
@@ -126,35 +373,34 @@ def create_seed_dictionary(ido_words, epo_words, min_similarity=0.7, max_pairs=5
     
     # 1. Exact matches (identical words)
     exact_matches = ido_set & epo_set
-    for word in exact_matches:
+    for word in sorted(exact_matches):
         seed_pairs.append((word, word))
     
     logger.info(f"  Found {len(exact_matches):,} exact matches")
     
     # 2. Near matches (edit distance 1-2)
-    from difflib import SequenceMatcher
-    
-    remaining_ido = ido_set - exact_matches
-    remaining_epo = epo_set - exact_matches
-    
-    for ido_word in tqdm(list(remaining_ido), desc="Finding cognates"):
-        if len(seed_pairs) >= max_pairs:
-            break
+    if len(seed_pairs) < max_pairs:
+        remaining_ido = sorted(ido_set - exact_matches)
+        remaining_epo = sorted(epo_set - exact_matches)
         
-        for epo_word in remaining_epo:
-            # Skip if very different lengths
-            if abs(len(ido_word) - len(epo_word)) > 2:
+        scored = score_cognate_pairs(
+            remaining_ido, remaining_epo, min_similarity, workers=workers
+        )
+        scored.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+        
+        used_ido = set()
+        used_epo = set()
+        for similarity, ido_word, epo_word in scored:
+            if len(seed_pairs) >= max_pairs:
+                break
+            if ido_word in used_ido or epo_word in used_epo:
                 continue
             
-            # Compute similarity
-            similarity = SequenceMatcher(None, ido_word, epo_word).ratio()
-            
-            if similarity >= min_similarity:
-                seed_pairs.append((ido_word, epo_word))
-                remaining_epo.discard(epo_word)
-                break
+            seed_pairs.append((ido_word, epo_word))
+            used_ido.add(ido_word)
+            used_epo.add(epo_word)
     
-    logger.info(f"  Found {len(seed_pairs) - len(exact_matches):,} near matches")
+    logger.info(f"  Found {max(len(seed_pairs) - len(exact_matches), 0):,} near matches")
     logger.info(f"✅ Total seed pairs: {len(seed_pairs):,}")
     
     return seed_pairs[:max_pairs]
@@ -164,32 +410,30 @@ def align_embeddings_procrustes(ido_emb, ido_words, ido_idx, epo_emb, epo_words,
     """
     Align Ido and Esperanto embeddings using Procrustes alignment.
     This finds an orthogonal transformation matrix W such that X @ W ≈ Y.
+    
+    Both embedding matrices must already be L2-normalized; only the
+    transformed Ido embeddings are renormalized.
     """
     logger.info(f"\n{'='*60}")
     logger.info(f"PROCRUSTES ALIGNMENT")
     logger.info(f"{'='*60}")
     logger.info(f"Seed pairs: {len(seed_pairs):,}")
     
-    # Build paired matrices
-    X_pairs = []  # Ido
-    Y_pairs = []  # Esperanto
-    
-    for ido_word, epo_word in seed_pairs:
-        if ido_word in ido_idx and epo_word in epo_idx:
-            X_pairs.append(ido_emb[ido_idx[ido_word]])
-            Y_pairs.append(epo_emb[epo_idx[epo_word]])
+    # Build paired index arrays in one pass, so X and Y rows always match
+    keep = [(ido_idx[ido_word], epo_idx[epo_word])
+            for ido_word, epo_word in seed_pairs
+            if ido_word in ido_idx and epo_word in epo_idx]
+    ido_sel = np.fromiter((i for i, _ in keep), dtype=np.int64, count=len(keep))
+    epo_sel = np.fromiter((j for _, j in keep), dtype=np.int64, count=len(keep))
     
-    X = np.array(X_pairs)
-    Y = np.array(Y_pairs)
+    X = np.ascontiguousarray(ido_emb[ido_sel], dtype=np.float32)  # Ido
+    Y = np.ascontiguousarray(epo_emb[epo_sel], dtype=np.float32)  # Esperanto
     
     logger.info(f"X (Ido) shape: {X.shape}")
     logger.info(f"Y (Esperanto) shape: {Y.shape}")
     
-    # Compute initial similarity
-    initial_sims = []
-    for i in range(len(X)):
-        sim = np.dot(X[i], Y[i]) / (np.linalg.norm(X[i]) * np.linalg.norm(Y[i]))
-        initial_sims.append(sim)
+    # Compute initial similarity (rows are normalized)
+    initial_sims = np.einsum('ij,ij->i', X, Y)
     
     initial_mean = np.mean(initial_sims)
     logger.info(f"Initial mean cosine similarity: {initial_mean:.4f}")
@@ -198,21 +442,15 @@ def align_embeddings_procrustes(ido_emb, ido_words, ido_idx, epo_emb, epo_words,
     logger.info("Computing orthogonal Procrustes transformation...")
     W, scale = orthogonal_procrustes(X, Y)
     
-    # Apply transformation to all Ido embeddings
-    ido_aligned = ido_emb @ W
+    # Apply transformation to all Ido embeddings (fp32 GEMM)
+    ido_aligned = ido_emb.astype(np.float32, copy=False) @ W
     
     # Normalize
-    ido_aligned = ido_aligned / (np.linalg.norm(ido_aligned, axis=1, keepdims=True) + 1e-8)
-    epo_normalized = epo_emb / (np.linalg.norm(epo_emb, axis=1, keepdims=True) + 1e-8)
+    ido_aligned = normalize_rows(ido_aligned)
+    epo_normalized = epo_emb
     
-    # Compute final similarity
-    X_aligned = ido_aligned[[ido_idx[w] for w, _ in seed_pairs if w in ido_idx]]
-    Y_normalized = epo_normalized[[epo_idx[w] for _, w in seed_pairs if w in epo_idx]]
-    
-    final_sims = []
-    for i in range(len(X_aligned)):
-        sim = np.dot(X_aligned[i], Y_normalized[i])
-        final_sims.append(sim)
+    # Compute final similarity on the same seed rows
+    final_sims = np.einsum('ij,ij->i', ido_aligned[ido_sel], epo_normalized[epo_sel])
     
     final_mean = np.mean(final_sims)
     improvement = final_mean - initial_mean
@@ -225,9 +463,37 @@ def align_embeddings_procrustes(ido_emb, ido_words, ido_idx, epo_emb, epo_words,
     return ido_aligned, epo_normalized, W
 
 
+def merge_top_k(top_sims, top_idx, chunk_sims, chunk_start, k):
+    """
+    Merge a chunk of similarities into the running per-row top-k.
+    
+    Uses argpartition, so the kept k columns are unordered.
+    """
+    chunk_idx = np.broadcast_to(
+        np.arange(chunk_start, chunk_start + chunk_sims.shape[1]),
+        chunk_sims.shape
+    )
+    sims = np.concatenate([top_sims, chunk_sims], axis=1)
+    idx = np.concatenate([top_idx, chunk_idx], axis=1)
+    
+    if sims.shape[1] > k:
+        keep = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        sims = np.take_along_axis(sims, keep, axis=1)
+        idx = np.take_along_axis(idx, keep, axis=1)
+    
+    return sims, idx
+
+
 def find_translation_candidates(ido_emb, ido_words, epo_emb, epo_words, 
-                                threshold=0.80, top_k=10, batch_size=100):
-    """Find translation candidates using aligned embeddings."""
+                                threshold=0.80, top_k=10, batch_size=100,
+                                epo_chunk_size=512):
+    """
+    Find translation candidates using aligned embeddings.
+    
+    The search is tiled over both languages: each Ido batch is compared
+    against Esperanto chunks of epo_chunk_size rows, which stay in cache,
+    while a running top-k per word is kept.
+    """
     logger.info(f"\n{'='*60}")
     logger.info(f"FINDING TRANSLATION CANDIDATES")
     logger.info(f"{'='*60}")
@@ -237,6 +503,7 @@ def find_translation_candidates(ido_emb, ido_words, epo_emb, epo_words,
     logger.info(f"Esperanto words: {len(epo_words):,}")
     
     candidates = {}
+    k = min(top_k, len(epo_words))
     
     # Process in batches for efficiency
     for i in tqdm(range(0, len(ido_words), batch_size), desc="Finding candidates"):
@@ -244,24 +511,29 @@ def find_translation_candidates(ido_emb, ido_words, epo_emb, epo_words,
         batch_ido = ido_emb[i:batch_end]
         batch_words = ido_words[i:batch_end]
         
-        # Compute similarities
-        similarities = np.dot(batch_ido, epo_emb.T)
+        top_sims = np.empty((len(batch_words), 0), dtype=batch_ido.dtype)
+        top_idx = np.empty((len(batch_words), 0), dtype=np.intp)
+        
+        # Compute similarities chunk by chunk, keeping the running top-k
+        for epo_start in range(0, len(epo_words), epo_chunk_size):
+            chunk_sims = batch_ido @ epo_emb[epo_start:epo_start + epo_chunk_size].T
+            top_sims, top_idx = merge_top_k(top_sims, top_idx, chunk_sims, epo_start, k)
+        
+        # Sort the top-k for each word
+        order = np.argsort(-top_sims, axis=1, kind='stable')
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
         
-        # Get top-k for each word
         for j, ido_word in enumerate(batch_words):
-            # Get indices above threshold
-            sims = similarities[j]
-            above_threshold = np.where(sims >= threshold)[0]
+            # Keep only candidates above threshold
+            above_threshold = top_sims[j] >= threshold
             
-            if len(above_threshold) > 0:
-                # Get top-k
-                top_indices = above_threshold[np.argsort(sims[above_threshold])][::-1][:top_k]
-                
+            if above_threshold.any():
                 translations = []
-                for idx in top_indices:
+                for idx, sim in zip(top_idx[j][above_threshold], top_sims[j][above_threshold]):
                     translations.append({
                         'epo': epo_words[idx],
-                        'similarity': float(sims[idx])
+                        'similarity': float(sim)
                     })
                 
                 candidates[ido_word] = translations
@@ -335,7 +607,14 @@ def main():
     parser.add_argument('--top-k', type=int, default=10,
                         help='Top K candidates per word')
     parser.add_argument('--skip-epo-extraction', action='store_true',
-                        help='Skip Esperanto extraction if already done')
+                        help='Skip Esperanto extraction if the cached embeddings '
+                             'match the current vocab and model')
+    parser.add_argument('--token-cache-dir', type=Path,
+                        help='Directory for cached tokenized vocabularies')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes for cognate scoring (default: all cores)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Quantize the encoder to int8 for extraction (CPU only)')
     
     args = parser.parse_args()
     args.output_dir.mkdir(parents=True, exist_ok=True)
@@ -353,24 +632,27 @@ def main():
     
     epo_embeddings_path = args.output_dir / 'esperanto_bert_embeddings.npz'
     
-    if args.skip_epo_extraction and epo_embeddings_path.exists():
+    # Load Esperanto vocabulary
+    epo_vocab = load_esperanto_vocab(
+        model_path=args.epo_model,
+        vocab_path=args.epo_vocab,
+        max_words=args.max_epo_words
+    )
+    epo_meta = build_cache_meta(epo_vocab, args.bert_model, int8=args.int8)
+    
+    if args.skip_epo_extraction and check_epo_cache(epo_embeddings_path, epo_meta, ido_emb.shape[1]):
         logger.info(f"Loading pre-extracted Esperanto embeddings...")
         epo_emb, epo_words, epo_idx = load_ido_embeddings(epo_embeddings_path)
     else:
         # Load BERT model
-        model, tokenizer, device = load_model(args.bert_model)
-        
-        # Load Esperanto vocabulary
-        epo_vocab = load_esperanto_vocab(
-            model_path=args.epo_model,
-            vocab_path=args.epo_vocab,
-            max_words=args.max_epo_words
-        )
+        model, tokenizer, device = load_model(args.bert_model, int8=args.int8)
         
         # Extract embeddings
         epo_emb, epo_words = extract_esperanto_embeddings(
             epo_vocab, model, tokenizer, device,
-            save_path=epo_embeddings_path
+            save_path=epo_embeddings_path,
+            token_cache_dir=args.token_cache_dir,
+            meta=epo_meta
         )
         epo_idx = {word: idx for idx, word in enumerate(epo_words)}
     
@@ -382,7 +664,8 @@ def main():
     seed_pairs = create_seed_dictionary(
         ido_words, epo_words,
         min_similarity=0.7,
-        max_pairs=args.seed_pairs
+        max_pairs=args.seed_pairs,
+        workers=args.workers
     )
     
     # Save seed dictionary
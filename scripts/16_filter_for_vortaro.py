@@ -6,64 +6,36 @@ This script takes the raw BERT alignment results and filters them for
 dictionary use, applying quality thresholds and formatting appropriately.
 """
 
-import json
 import csv
 import argparse
+import numpy as np
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from collections import Counter
 
-def load_translation_candidates(input_file: str) -> Dict[str, List[Dict]]:
-    """Load translation candidates from JSON."""
-    print(f"Loading translation candidates from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    print(f"✅ Loaded {len(data)} Ido words with candidates")
-    return data
+from _pipeline import Candidates, load_and_filter, save_json
 
-def filter_candidates(
-    data: Dict[str, List[Dict]],
-    min_similarity: float = 0.85,
-    max_candidates: int = 3
-) -> Dict[str, List[Dict]]:
-    """Filter candidates by similarity threshold and limit count."""
-    print(f"\nFiltering candidates (min_sim={min_similarity}, max={max_candidates})...")
-    
-    filtered = {}
-    total_before = sum(len(candidates) for candidates in data.values())
-    
-    for ido_word, candidates in data.items():
-        # Filter by similarity
-        high_quality = [
-            c for c in candidates 
-            if c['similarity'] >= min_similarity
-        ]
-        
-        # Limit number of candidates
-        if high_quality:
-            filtered[ido_word] = high_quality[:max_candidates]
-    
-    total_after = sum(len(candidates) for candidates in filtered.values())
-    
-    print(f"✅ Filtered: {len(filtered)} Ido words, {total_after} total pairs")
-    print(f"   Reduction: {total_before} → {total_after} ({100*(total_before-total_after)/total_before:.1f}% removed)")
-    
-    return filtered
-
-def calculate_frequency_ranks(data: Dict[str, List[Dict]]) -> Dict[str, int]:
+def calculate_frequency_ranks(data: Dict[str, Candidates]) -> Dict[str, int]:
     """Assign frequency ranks (lower = more common)."""
     # Words appearing in data are assumed to be from frequency-sorted vocabulary
     return {word: rank for rank, word in enumerate(data.keys(), start=1)}
 
 def format_as_json(
-    data: Dict[str, List[Dict]],
+    data: Dict[str, Candidates],
     output_file: str,
-    include_frequencies: bool = True
+    freq_ranks: Optional[Dict[str, int]] = None,
+    sorted_keys: Optional[List[str]] = None
 ) -> None:
-    """Format as JSON dictionary."""
+    """
+    Format as JSON dictionary.
+    
+    Frequency ranks are included when freq_ranks (from
+    calculate_frequency_ranks) is given. freq_ranks and sorted_keys are
+    computed once by the caller and shared across formats.
+    """
     print(f"\nFormatting as JSON...")
     
-    freq_ranks = calculate_frequency_ranks(data) if include_frequencies else {}
+    include_frequencies = freq_ranks is not None
     
     output = {
         "ido_to_esperanto": [],
@@ -75,80 +47,91 @@ def format_as_json(
         }
     }
     
-    for ido_word, candidates in sorted(data.items()):
+    if sorted_keys is None:
+        sorted_keys = sorted(data)
+    
+    for ido_word in sorted_keys:
+        candidates = data[ido_word]
         entry = {
             "ido": ido_word,
-            "esperanto": [c['epo'] for c in candidates],
-            "similarities": [round(c['similarity'], 4) for c in candidates],
+            "esperanto": candidates['epo'],
+            "similarities": [round(sim, 4) for sim in candidates['sim'].tolist()],
         }
         
-        if include_frequencies and ido_word in freq_ranks:
+        if include_frequencies:
             entry["frequency_rank"] = freq_ranks[ido_word]
         
         output["ido_to_esperanto"].append(entry)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    save_json(output, output_file)
     
     print(f"✅ Saved JSON to {output_file}")
     print(f"   Entries: {len(output['ido_to_esperanto'])}")
 
 def format_as_csv(
-    data: Dict[str, List[Dict]],
+    data: Dict[str, Candidates],
     output_file: str,
-    include_frequencies: bool = True
+    freq_ranks: Optional[Dict[str, int]] = None,
+    sorted_keys: Optional[List[str]] = None
 ) -> None:
-    """Format as CSV."""
+    """
+    Format as CSV.
+    
+    Frequency ranks are included when freq_ranks (from
+    calculate_frequency_ranks) is given. freq_ranks and sorted_keys are
+    computed once by the caller and shared across formats.
+    """
     print(f"\nFormatting as CSV...")
     
-    freq_ranks = calculate_frequency_ranks(data) if include_frequencies else {}
+    include_frequencies = freq_ranks is not None
     
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        fieldnames = ['ido', 'esperanto', 'similarity', 'rank', 'source']
-        if not include_frequencies:
-            fieldnames.remove('rank')
-        
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        rows_written = 0
-        for ido_word, candidates in sorted(data.items()):
-            for candidate in candidates:
-                row = {
-                    'ido': ido_word,
-                    'esperanto': candidate['epo'],
-                    'similarity': round(candidate['similarity'], 4),
-                    'source': 'bert-alignment'
-                }
-                
-                if include_frequencies and ido_word in freq_ranks:
-                    row['rank'] = freq_ranks[ido_word]
-                
-                writer.writerow(row)
-                rows_written += 1
+    fieldnames = ['ido', 'esperanto', 'similarity', 'rank', 'source']
+    if not include_frequencies:
+        fieldnames.remove('rank')
+    
+    if sorted_keys is None:
+        sorted_keys = sorted(data)
+    
+    def gen_rows():
+        for ido_word in sorted_keys:
+            candidates = data[ido_word]
+            if include_frequencies:
+                rank = freq_ranks[ido_word]
+                for epo_word, sim in zip(candidates['epo'], candidates['sim'].tolist()):
+                    yield (ido_word, epo_word, round(sim, 4), rank, 'bert-alignment')
+            else:
+                for epo_word, sim in zip(candidates['epo'], candidates['sim'].tolist()):
+                    yield (ido_word, epo_word, round(sim, 4), 'bert-alignment')
+    
+    # Plain tuples + one writerows call, through a 1 MiB write buffer
+    with open(output_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(gen_rows())
+    
+    rows_written = sum(len(candidates['sim']) for candidates in data.values())
     
     print(f"✅ Saved CSV to {output_file}")
     print(f"   Rows: {rows_written}")
 
-def generate_statistics(data: Dict[str, List[Dict]]) -> Dict[str, Any]:
+def generate_statistics(data: Dict[str, Candidates]) -> Dict[str, Any]:
     """Generate statistics about the filtered data."""
     total_words = len(data)
-    total_pairs = sum(len(candidates) for candidates in data.values())
+    total_pairs = sum(len(candidates['sim']) for candidates in data.values())
     
-    candidates_per_word = [len(candidates) for candidates in data.values()]
-    avg_candidates = sum(candidates_per_word) / len(candidates_per_word) if candidates_per_word else 0
+    avg_candidates = total_pairs / total_words if total_words else 0
     
-    all_similarities = [
-        c['similarity'] 
-        for candidates in data.values() 
-        for c in candidates
-    ]
-    avg_similarity = sum(all_similarities) / len(all_similarities) if all_similarities else 0
+    # One flat array of similarities; reductions run in NumPy
+    all_similarities = np.concatenate(
+        [candidates['sim'] for candidates in data.values()] or [np.empty(0)]
+    )
+    has_similarities = all_similarities.size > 0
+    avg_similarity = float(all_similarities.mean()) if has_similarities else 0
     
     # Count cognates (identical words)
     cognates = sum(
         1 for ido_word, candidates in data.items()
-        if any(c['epo'] == ido_word for c in candidates)
+        if ido_word in candidates['epo']
     )
     
     stats = {
@@ -158,8 +141,8 @@ def generate_statistics(data: Dict[str, List[Dict]]) -> Dict[str, Any]:
         "average_similarity": round(avg_similarity, 4),
         "cognates_count": cognates,
         "cognates_percentage": round(100 * cognates / total_words, 2) if total_words > 0 else 0,
-        "min_similarity": round(min(all_similarities), 4) if all_similarities else 0,
-        "max_similarity": round(max(all_similarities), 4) if all_similarities else 0
+        "min_similarity": round(float(all_similarities.min()), 4) if has_similarities else 0,
+        "max_similarity": round(float(all_similarities.max()), 4) if has_similarities else 0
     }
     
     return stats
@@ -201,6 +184,21 @@ def main():
         default='both',
         help='Output format (default: both)'
     )
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache the filtered candidates in this directory (pickle files; off by default)'
+    )
+    parser.add_argument(
+        '--assume-sorted',
+        action='store_true',
+        help='Candidates are sorted by similarity (descending); find cutoffs by binary search'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for filtering (default: 1)'
+    )
     
     args = parser.parse_args()
     
@@ -212,14 +210,14 @@ def main():
     print("VORTARO DICTIONARY FORMATTER")
     print("="*60)
     
-    # Load data
-    data = load_translation_candidates(args.input)
-    
-    # Filter
-    filtered = filter_candidates(
-        data,
+    # Load and filter (cached with --cache-dir, shared with 17_format_for_apertium.py)
+    filtered, _ = load_and_filter(
+        args.input,
         min_similarity=args.min_similarity,
-        max_candidates=args.max_candidates
+        max_candidates=args.max_candidates,
+        cache_dir=args.cache_dir,
+        assume_sorted=args.assume_sorted,
+        workers=args.workers
     )
     
     # Generate statistics
@@ -232,18 +230,20 @@ def main():
     
     # Save statistics
     stats_file = output_dir / "vortaro_stats.json"
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, indent=2)
+    save_json(stats, stats_file)
     print(f"\n✅ Statistics saved to {stats_file}")
     
-    # Format output
+    # Format output (sort the words and rank them once for both formats)
+    sorted_keys = sorted(filtered)
+    freq_ranks = calculate_frequency_ranks(filtered) if args.include_frequencies else None
+    
     if args.format in ['json', 'both']:
         json_file = output_dir / "ido_epo_dictionary.json"
-        format_as_json(filtered, str(json_file), args.include_frequencies)
+        format_as_json(filtered, str(json_file), freq_ranks, sorted_keys)
     
     if args.format in ['csv', 'both']:
         csv_file = output_dir / "ido_epo_dictionary.csv"
-        format_as_csv(filtered, str(csv_file), args.include_frequencies)
+        format_as_csv(filtered, str(csv_file), freq_ranks, sorted_keys)
     
     print("\n" + "="*60)
     print("✅ VORTARO FORMATTING COMPLETE")
@@ -6,21 +6,80 @@ This script generates valid Apertium XML dictionary entries from
 BERT alignment results, including POS tagging when possible.
 """
 
-import json
 import argparse
 import re
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from xml.etree import ElementTree as ET
-from xml.dom import minidom
 
-def load_translation_candidates(input_file: str) -> Dict[str, List[Dict]]:
-    """Load translation candidates from JSON."""
-    print(f"Loading translation candidates from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    print(f"✅ Loaded {len(data)} Ido words with candidates")
-    return data
+from _pipeline import Candidates, load_and_filter, save_json, chunk_items, map_chunks, select_candidates
+
+# Common POS tags
+POS_TAGS = {
+    'n': 'Noun',
+    'vblex': 'Lexical verb',
+    'adj': 'Adjective',
+    'adv': 'Adverb',
+    'prn': 'Pronoun',
+    'det': 'Determiner',
+    'prep': 'Preposition',
+    'cnjcoo': 'Coordinating conjunction',
+    'cnjsub': 'Subordinating conjunction',
+    'num': 'Numeral'
+}
+
+# Streamed .dix layout (same structure as create_dix_document)
+DIX_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<dictionary>\n'
+    '  <alphabet/>\n'
+    '  <sdefs>\n'
+    + ''.join(f'    <sdef n="{tag}"/>\n' for tag in POS_TAGS) +
+    '  </sdefs>\n'
+    '  <section id="main" type="standard">\n'
+)
+DIX_FOOTER = (
+    '  </section>\n'
+    '</dictionary>\n'
+)
+DIX_ENTRY_TEMPLATE = (
+    '    <e><!-- similarity: {similarity:.4f} --><p>'
+    '<l>{ido}{ido_tag}</l><r>{epo}{epo_tag}</r></p></e>\n'
+)
+
+# Counters reported by filter_and_format (in output order)
+STATS_KEYS = (
+    'total_processed',
+    'entries_created',
+    'cognates',
+    'with_pos',
+    'without_pos',
+    'skipped_pos_mismatch',
+)
+
+# Text escaping for element content, as done by ElementTree
+XML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# POS by word ending: two-letter endings are looked up before one-letter ones
+IDO_POS_SUFFIXES = {
+    'ar': 'vblex',  # lexical verb
+    'is': 'vblex',  # conjugated verb
+    'as': 'vblex',
+    'os': 'vblex',
+    'o': 'n',       # noun
+    'a': 'adj',     # adjective
+    'e': 'adv',     # adverb
+}
+
+ESPERANTO_POS_SUFFIXES = {
+    'as': 'vblex',  # conjugated verb
+    'is': 'vblex',
+    'os': 'vblex',
+    'i': 'vblex',   # lexical verb
+    'o': 'n',       # noun
+    'a': 'adj',     # adjective
+    'e': 'adv',     # adverb
+}
 
 def guess_pos_ido(word: str) -> str:
     """
@@ -31,20 +90,9 @@ def guess_pos_ido(word: str) -> str:
     - -o: noun (hundo, libro)
     - -a: adjective (bela, granda)
     - -e: adverb (rapide, bone)
-    - -i: verb (past participle or irregular)
+    - -is/-as/-os: conjugated verb
     """
-    if word.endswith('ar'):
-        return 'vblex'  # lexical verb
-    elif word.endswith('o'):
-        return 'n'      # noun
-    elif word.endswith('a'):
-        return 'adj'    # adjective
-    elif word.endswith('e'):
-        return 'adv'    # adverb
-    elif word.endswith('is') or word.endswith('as') or word.endswith('os'):
-        return 'vblex'  # conjugated verb
-    else:
-        return 'unknown'
+    return IDO_POS_SUFFIXES.get(word[-2:]) or IDO_POS_SUFFIXES.get(word[-1:], 'unknown')
 
 def guess_pos_esperanto(word: str) -> str:
     """
@@ -55,23 +103,14 @@ def guess_pos_esperanto(word: str) -> str:
     - -o: noun (hundo, libro)
     - -a: adjective (bela, granda)
     - -e: adverb (rapide, bone)
+    - -as/-is/-os: conjugated verb
     """
-    if word.endswith('i'):
-        return 'vblex'  # lexical verb
-    elif word.endswith('o'):
-        return 'n'      # noun
-    elif word.endswith('a'):
-        return 'adj'    # adjective
-    elif word.endswith('e'):
-        return 'adv'    # adverb
-    elif word.endswith('as') or word.endswith('is') or word.endswith('os'):
-        return 'vblex'  # conjugated verb
-    else:
-        return 'unknown'
+    return ESPERANTO_POS_SUFFIXES.get(word[-2:]) or ESPERANTO_POS_SUFFIXES.get(word[-1:], 'unknown')
 
-def pos_tags_match(ido_word: str, epo_word: str) -> bool:
+def pos_tags_match(ido_word: str, epo_word: str, ido_pos: Optional[str] = None) -> bool:
     """Check if POS tags match between Ido and Esperanto words."""
-    ido_pos = guess_pos_ido(ido_word)
+    if ido_pos is None:
+        ido_pos = guess_pos_ido(ido_word)
     epo_pos = guess_pos_esperanto(epo_word)
     
     # Unknown tags don't match
@@ -127,6 +166,38 @@ def create_dix_entry(ido_word: str, epo_word: str, similarity: float, add_pos: b
     
     return entry
 
+def format_dix_entry(ido_word: str, epo_word: str, similarity: float, add_pos: bool = True, skip_pos_mismatch: bool = True, pos_ido: Optional[str] = None) -> Optional[Tuple[str, bool]]:
+    """
+    Format an Apertium .dix entry as one line of XML.
+    
+    Produces the same entry as create_dix_entry, without building an
+    ElementTree. pos_ido may be passed in when the caller formats several
+    candidates for the same Ido word. Returns (xml_line, has_pos), or None
+    if skipped.
+    """
+    if add_pos and pos_ido is None:
+        pos_ido = guess_pos_ido(ido_word)
+    
+    if add_pos and skip_pos_mismatch and not pos_tags_match(ido_word, epo_word, pos_ido):
+        return None
+    
+    ido_tag = epo_tag = ''
+    if add_pos:
+        pos_epo = guess_pos_esperanto(epo_word)
+        
+        if pos_ido != 'unknown' and pos_epo != 'unknown' and pos_ido == pos_epo:
+            ido_tag = f'<s n="{pos_ido}"/>'
+            epo_tag = f'<s n="{pos_epo}"/>'
+    
+    line = DIX_ENTRY_TEMPLATE.format(
+        similarity=similarity,
+        ido=ido_word.translate(XML_ESCAPE),
+        ido_tag=ido_tag,
+        epo=epo_word.translate(XML_ESCAPE),
+        epo_tag=epo_tag
+    )
+    return line, bool(ido_tag)
+
 def create_dix_document(
     entries: List[ET.Element],
     direction: str = 'ido-epo'
@@ -140,21 +211,7 @@ def create_dix_document(
     # Add symbol definitions (sdefs)
     sdefs = ET.SubElement(root, 'sdefs')
     
-    # Common POS tags
-    pos_tags = {
-        'n': 'Noun',
-        'vblex': 'Lexical verb',
-        'adj': 'Adjective',
-        'adv': 'Adverb',
-        'prn': 'Pronoun',
-        'det': 'Determiner',
-        'prep': 'Preposition',
-        'cnjcoo': 'Coordinating conjunction',
-        'cnjsub': 'Subordinating conjunction',
-        'num': 'Numeral'
-    }
-    
-    for tag, description in pos_tags.items():
+    for tag in POS_TAGS:
         sdef = ET.SubElement(sdefs, 'sdef')
         sdef.set('n', tag)
         # Don't add comments inside sdef - they must be empty elements
@@ -169,58 +226,36 @@ def create_dix_document(
     
     return root
 
-def prettify_xml(elem: ET.Element) -> str:
-    """Return a pretty-printed XML string."""
-    rough_string = ET.tostring(elem, encoding='unicode')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
-
-def filter_and_format(
-    data: Dict[str, List[Dict]],
-    min_similarity: float = 0.80,
-    max_candidates: int = 1,
-    add_pos_tags: bool = True,
-    bidirectional: bool = True
-) -> Tuple[List[ET.Element], Dict]:
-    """Filter candidates and create .dix entries."""
-    print(f"\nFormatting for Apertium...")
-    print(f"  Min similarity: {min_similarity}")
-    print(f"  Max candidates: {max_candidates}")
-    print(f"  Add POS tags: {add_pos_tags}")
-    print(f"  Bidirectional: {bidirectional}")
+def _format_chunk(items, min_similarity, max_candidates, add_pos_tags):
+    """
+    Format one chunk of (ido_word, candidates) pairs.
     
-    entries = []
-    stats = {
-        'total_processed': 0,
-        'entries_created': 0,
-        'cognates': 0,
-        'with_pos': 0,
-        'without_pos': 0,
-        'skipped_pos_mismatch': 0
-    }
-    
-    for ido_word, candidates in sorted(data.items()):
+    Returns the chunk's .dix entry lines as UTF-8 bytes and its statistics.
+    """
+    stats = dict.fromkeys(STATS_KEYS, 0)
+    lines = []
+    
+    for ido_word, candidates in items:
         stats['total_processed'] += 1
         
-        # Filter by similarity
-        high_quality = [
-            c for c in candidates
-            if c['similarity'] >= min_similarity
-        ]
+        high_quality = select_candidates(candidates, min_similarity, max_candidates)
+        if high_quality is None:
+            continue
         
-        # Take top N candidates
-        for candidate in high_quality[:max_candidates]:
-            epo_word = candidate.get('translation', candidate.get('epo', ''))
-            similarity = candidate['similarity']
-            
+        # The Ido POS is the same for every candidate of this word
+        pos_ido = guess_pos_ido(ido_word) if add_pos_tags else None
+        
+        for epo_word, similarity in zip(high_quality['epo'], high_quality['sim'].tolist()):
             if not epo_word:
                 continue
             
-            # Create entry (allow entries without matching POS tags - don't skip them)
-            entry = create_dix_entry(ido_word, epo_word, similarity, add_pos_tags, skip_pos_mismatch=False)
+            # Format entry (allow entries without matching POS tags - don't skip them)
+            formatted = format_dix_entry(ido_word, epo_word, similarity, add_pos_tags,
+                                         skip_pos_mismatch=False, pos_ido=pos_ido)
             
-            if entry is not None:
-                entries.append(entry)
+            if formatted is not None:
+                line, has_pos = formatted
+                lines.append(line)
                 stats['entries_created'] += 1
                 
                 # Check if cognate
@@ -228,7 +263,6 @@ def filter_and_format(
                     stats['cognates'] += 1
                 
                 # Count POS tagging
-                has_pos = entry.find('.//s') is not None
                 if has_pos:
                     stats['with_pos'] += 1
                 else:
@@ -236,13 +270,62 @@ def filter_and_format(
             else:
                 stats['skipped_pos_mismatch'] += 1
     
+    return ''.join(lines).encode('utf-8'), stats
+
+def filter_and_format(
+    data: Dict[str, Candidates],
+    output_file: Path,
+    min_similarity: float = 0.80,
+    max_candidates: int = 1,
+    add_pos_tags: bool = True,
+    bidirectional: bool = True,
+    total_words: Optional[int] = None,
+    workers: int = 1,
+    chunk_size: int = 10000
+) -> Dict:
+    """
+    Filter candidates and stream .dix entries to output_file.
+    
+    Words are formatted in sorted chunks of chunk_size and each chunk is
+    written as soon as it is ready, so memory use does not grow with the
+    size of the dictionary. With workers > 1 the chunks are formatted by a
+    process pool and still written in order. When data has already been
+    filtered (see _pipeline.load_and_filter), total_words gives the word
+    count of the unfiltered input for the total_processed statistic.
+    data holds per-word epo/sim arrays as returned by
+    _pipeline.load_translation_candidates.
+    """
+    print(f"\nFormatting for Apertium...")
+    print(f"  Min similarity: {min_similarity}")
+    print(f"  Max candidates: {max_candidates}")
+    print(f"  Add POS tags: {add_pos_tags}")
+    print(f"  Bidirectional: {bidirectional}")
+    
+    stats = dict.fromkeys(STATS_KEYS, 0)
+    chunks = chunk_items([(ido_word, data[ido_word]) for ido_word in sorted(data)], chunk_size)
+    
+    # Chunks arrive already encoded; write them through a 1 MiB binary buffer
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        f.write(DIX_HEADER.encode('utf-8'))
+        
+        for encoded, chunk_stats in map_chunks(_format_chunk, chunks, min_similarity,
+                                               max_candidates, add_pos_tags, workers=workers):
+            f.write(encoded)
+            for key, value in chunk_stats.items():
+                stats[key] += value
+        
+        f.write(DIX_FOOTER.encode('utf-8'))
+    
+    if total_words is not None:
+        stats['total_processed'] = total_words
+    
     print(f"\n✅ Created {stats['entries_created']} dictionary entries")
     print(f"   Cognates: {stats['cognates']} ({100*stats['cognates']/stats['entries_created']:.1f}%)")
     print(f"   With POS: {stats['with_pos']} ({100*stats['with_pos']/stats['entries_created']:.1f}%)")
     print(f"   Without POS: {stats['without_pos']}")
     print(f"   Skipped (POS mismatch): {stats['skipped_pos_mismatch']}")
     
-    return entries, stats
+    return stats
 
 def main():
     parser = argparse.ArgumentParser(
@@ -286,6 +369,21 @@ def main():
         default='dix',
         help='Output format (default: dix)'
     )
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache the filtered candidates in this directory (pickle files; off by default)'
+    )
+    parser.add_argument(
+        '--assume-sorted',
+        action='store_true',
+        help='Candidates are sorted by similarity (descending); find cutoffs by binary search'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for filtering and formatting (default: 1)'
+    )
     
     args = parser.parse_args()
     
@@ -297,37 +395,34 @@ def main():
     print("APERTIUM .DIX FORMATTER")
     print("="*60)
     
-    # Load data
-    data = load_translation_candidates(args.input)
-    
-    # Filter and format
-    entries, stats = filter_and_format(
-        data,
+    # Load and filter (cached with --cache-dir, shared with 16_filter_for_vortaro.py)
+    filtered, total_words = load_and_filter(
+        args.input,
         min_similarity=args.min_similarity,
         max_candidates=args.max_candidates,
-        add_pos_tags=args.add_pos_tags,
-        bidirectional=args.bidirectional
+        cache_dir=args.cache_dir,
+        assume_sorted=args.assume_sorted,
+        workers=args.workers
     )
     
-    # Create .dix document
-    dix_root = create_dix_document(entries, direction='ido-epo')
-    
-    # Save to file
+    # Format and save
     output_file = output_dir / 'ido-epo.dix'
-    xml_string = prettify_xml(dix_root)
-    
-    # Add XML declaration
-    xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + '\n'.join(xml_string.split('\n')[1:])
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(xml_string)
+    stats = filter_and_format(
+        filtered,
+        output_file,
+        min_similarity=args.min_similarity,
+        max_candidates=args.max_candidates,
+        add_pos_tags=args.add_pos_tags,
+        bidirectional=args.bidirectional,
+        total_words=total_words,
+        workers=args.workers
+    )
     
     print(f"\n✅ Saved .dix to {output_file}")
     
     # Save statistics
     stats_file = output_dir / 'apertium_format_stats.json'
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, indent=2)
+    save_json(stats, stats_file)
     print(f"✅ Statistics saved to {stats_file}")
     
     print("\n" + "="*60)
@@ -12,9 +12,10 @@ This script:
 
 import argparse
 import re
-from xml.etree import ElementTree as ET
-from xml.dom import minidom
-from typing import List, Set, Tuple
+from operator import itemgetter
+from typing import Dict, List, Set, Tuple
+
+from _dix import ET, parse_dix, write_dix_document
 
 def extract_word_from_entry(entry: ET.Element) -> str:
     """Extract the Ido word (left side) from a dictionary entry."""
@@ -25,12 +26,6 @@ def extract_word_from_entry(entry: ET.Element) -> str:
         return text.strip()
     return ''
 
-def prettify_xml(elem: ET.Element) -> str:
-    """Return a pretty-printed XML string."""
-    rough_string = ET.tostring(elem, encoding='unicode')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
-
 def parse_dix_file(file_path: str) -> Tuple[ET.Element, List[ET.Element], Set[str]]:
     """
     Parse a .dix file and extract entries.
@@ -40,7 +35,7 @@ def parse_dix_file(file_path: str) -> Tuple[ET.Element, List[ET.Element], Set[st
         - List of entry elements
         - Set of Ido words in entries
     """
-    tree = ET.parse(file_path)
+    tree = parse_dix(file_path)
     root = tree.getroot()
     
     # Find the main section with entries
@@ -103,6 +98,15 @@ def merge_dictionaries(
         'conflicts': 0
     }
     
+    # Ido word of every entry in the section, computed once, in document order
+    entry_words = {entry: extract_word_from_entry(entry) for entry in existing_entries}
+    
+    # Index entries by Ido word for conflict lookups
+    existing_index: Dict[str, List[ET.Element]] = {}
+    if not prefer_existing:
+        for entry, word in entry_words.items():
+            existing_index.setdefault(word, []).append(entry)
+    
     # Add new entries that don't exist
     added_entries = []
     for entry in new_entries:
@@ -111,46 +115,36 @@ def merge_dictionaries(
         if word in existing_words:
             stats['duplicates'] += 1
             if not prefer_existing:
-                # Remove old entry and add new one
-                for old_entry in section.findall('e'):
-                    if extract_word_from_entry(old_entry) == word:
-                        section.remove(old_entry)
-                        break
+                # Remove the first old entry for this word and add the new one
+                same_word = existing_index[word]
+                old_entry = same_word.pop(0)
+                section.remove(old_entry)
+                del entry_words[old_entry]
                 section.append(entry)
+                entry_words[entry] = word
+                same_word.append(entry)
                 stats['conflicts'] += 1
         else:
             section.append(entry)
+            entry_words[entry] = word
             added_entries.append(word)
             stats['added'] += 1
     
     # Sort entries alphabetically by Ido word
     if sort_entries:
         print("🔤 Sorting entries alphabetically...")
-        entries_with_words = []
-        for entry in section.findall('e'):
-            word = extract_word_from_entry(entry)
-            entries_with_words.append((word.lower(), entry))
+        entries_with_words = [(word.lower(), entry) for entry, word in entry_words.items()]
+        entries_with_words.sort(key=itemgetter(0))
         
-        entries_with_words.sort(key=lambda x: x[0])
-        
-        # Clear section and re-add sorted entries
-        for entry in section.findall('e'):
-            section.remove(entry)
-        
-        for _, entry in entries_with_words:
-            section.append(entry)
+        # Replace the entries in one assignment, keeping any non-entry children first
+        others = [child for child in section if child.tag != 'e']
+        section[:] = others + [entry for _, entry in entries_with_words]
     
-    stats['final_entries'] = len(section.findall('e'))
+    stats['final_entries'] = len(entry_words)
     
     # Write output
     print(f"💾 Writing merged dictionary: {output_file}")
-    xml_string = prettify_xml(existing_root)
-    
-    # Add XML declaration
-    xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + '\n'.join(xml_string.split('\n')[1:])
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(xml_string)
+    write_dix_document(existing_root, output_file)
     
     return stats
 
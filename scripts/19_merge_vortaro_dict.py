@@ -10,18 +10,22 @@ This script:
 5. Updates total word count
 """
 
-import json
 import argparse
 from datetime import datetime
 from typing import Dict, List, Set
 
+from _pipeline import load_json, save_json
+
+def _word_count(data: Dict) -> int:
+    """Number of Ido words in a vortaro dict (every key except 'metadata')."""
+    return len(data) - ('metadata' in data)
+
 def load_vortaro_dict(file_path: str) -> Dict:
     """Load existing vortaro dictionary."""
     print(f"📖 Loading existing vortaro: {file_path}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(file_path)
     
-    word_count = sum(1 for key in data.keys() if key != 'metadata')
+    word_count = _word_count(data)
     print(f"   Found {word_count} Ido words")
     return data
 
@@ -33,8 +37,7 @@ def load_bert_translations(file_path: str) -> Dict[str, List[str]]:
         Dict mapping Ido word -> List of Esperanto translations
     """
     print(f"📖 Loading BERT translations: {file_path}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(file_path)
     
     translations = {}
     for entry in data.get('ido_to_esperanto', []):
@@ -53,8 +56,11 @@ def merge_dictionaries(
     """
     Merge BERT translations into existing vortaro dictionary.
     
+    The existing dictionary is updated in place (and returned as the merged
+    dictionary) to avoid copying a table of every Ido word.
+    
     Args:
-        existing: Existing vortaro dictionary
+        existing: Existing vortaro dictionary (modified in place)
         bert_translations: BERT translations (ido -> [esperanto])
         prefer_existing: If True, don't overwrite existing entries
     
@@ -63,35 +69,42 @@ def merge_dictionaries(
     """
     print("\n🔄 Merging dictionaries...")
     
-    merged = existing.copy()
+    # One timestamp for both last_update and bert_integration.date
+    now_iso = datetime.now().isoformat()
+    
+    merged = existing
     stats = {
-        'existing_words': sum(1 for k in existing.keys() if k != 'metadata'),
+        'existing_words': _word_count(existing),
         'bert_words': len(bert_translations),
         'new_words': 0,
         'updated_words': 0,
         'new_translations': 0
     }
     
+    # Counters stay in locals inside the loop and are stored in stats after it
+    new_words = updated_words = new_translations = 0
+    
     for ido_word, epo_words in bert_translations.items():
-        if ido_word in existing and ido_word != 'metadata':
+        # One lookup serves both the membership test and the update
+        entry = merged.get(ido_word) if ido_word != 'metadata' else None
+        if entry is not None:
             # Word exists - add new translations
-            existing_epo = set(existing[ido_word].get('esperanto_words', []))
-            new_epo = set(epo_words)
+            existing_epo = entry.get('esperanto_words', [])
             
             if not prefer_existing or not existing_epo:
-                # Add BERT translations that don't exist
-                added = new_epo - existing_epo
+                # Add BERT translations that don't exist, in BERT order
+                existing_set = set(existing_epo)
+                added = [w for w in dict.fromkeys(epo_words) if w not in existing_set]
                 if added:
-                    merged[ido_word]['esperanto_words'].extend(list(added))
-                    stats['new_translations'] += len(added)
+                    entry.setdefault('esperanto_words', []).extend(added)
+                    new_translations += len(added)
                     
                     # Add BERT as source
-                    if 'sources' not in merged[ido_word]:
-                        merged[ido_word]['sources'] = []
-                    if 'bert_alignment' not in merged[ido_word]['sources']:
-                        merged[ido_word]['sources'].append('bert_alignment')
+                    sources = entry.setdefault('sources', [])
+                    if 'bert_alignment' not in sources:
+                        sources.append('bert_alignment')
                     
-                    stats['updated_words'] += 1
+                    updated_words += 1
         else:
             # New word - add it
             merged[ido_word] = {
@@ -99,14 +112,18 @@ def merge_dictionaries(
                 'sources': ['bert_alignment'],
                 'morfologio': []
             }
-            stats['new_words'] += 1
+            new_words += 1
+    
+    stats['new_words'] = new_words
+    stats['updated_words'] = updated_words
+    stats['new_translations'] = new_translations
     
     # Update metadata
     if 'metadata' not in merged:
         merged['metadata'] = {}
     
-    merged['metadata']['total_words'] = sum(1 for k in merged.keys() if k != 'metadata')
-    merged['metadata']['last_update'] = datetime.now().isoformat()
+    merged['metadata']['total_words'] = _word_count(merged)
+    merged['metadata']['last_update'] = now_iso
     
     # Add bert_alignment to sources list
     if 'sources' not in merged['metadata']:
@@ -115,7 +132,7 @@ def merge_dictionaries(
         merged['metadata']['sources'].append('bert_alignment')
     
     merged['metadata']['bert_integration'] = {
-        'date': datetime.now().isoformat(),
+        'date': now_iso,
         'words_added': stats['new_words'],
         'words_updated': stats['updated_words'],
         'translations_added': stats['new_translations']
@@ -170,8 +187,7 @@ def main():
     
     # Write output
     print(f"\n💾 Writing merged dictionary: {args.output}")
-    with open(args.output, 'w', encoding='utf-8') as f:
-        json.dump(merged, f, ensure_ascii=False, indent=2)
+    save_json(merged, args.output)
     
     # Display statistics
     print()
@@ -189,8 +205,10 @@ def main():
     print(f"✅ Dictionary merged successfully!")
     print(f"   Output: {args.output}")
     print()
+    # An empty starting dictionary has no meaningful growth percentage
+    growth = (100.0 * stats['new_words'] / stats['existing_words']) if stats['existing_words'] else 0.0
     print(f"Coverage increase: +{stats['new_words']} words, +{stats['new_translations']} translations")
-    print(f"  ({100 * stats['new_words'] / stats['existing_words']:.1f}% growth in words)")
+    print(f"  ({growth:.1f}% growth in words)")
 
 if __name__ == '__main__':
     main()
@@ -18,12 +18,17 @@ Usage:
         --min-similarity 0.85
 """
 
-import json
 import argparse
+import shutil
 import sys
+import tempfile
+import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+
+from _pipeline import dump_json, iter_bert_candidates
 
 
 # Function words - don't infer morphology (let higher-priority sources handle)
@@ -43,6 +48,48 @@ FUNCTION_WORDS = {
 }
 
 
+# Ido endings -> (pos, paradigm, minimum word length)
+IDO_SUFFIXES_2 = {
+    'ar': ('vblex', 'ar__vblex', 2),  # verb infinitive
+    # Verb conjugated forms - convert to infinitive base
+    'as': ('vblex', 'ar__vblex', 4),
+    'is': ('vblex', 'ar__vblex', 4),
+    'os': ('vblex', 'ar__vblex', 4),
+    'us': ('vblex', 'ar__vblex', 4),
+    'ez': ('vblex', 'ar__vblex', 4),
+}
+
+IDO_SUFFIXES_1 = {
+    'o': ('n', 'o__n', 2),      # noun (singular)
+    'i': ('n', 'o__n', 3),      # noun (plural) - could also be other things, be conservative
+    'a': ('adj', 'a__adj', 2),  # adjective
+    'e': ('adv', 'e__adv', 3),  # adverb
+}
+
+
+@lru_cache(maxsize=1 << 16)
+def _ido_pos_paradigm(lemma: str) -> Optional[Tuple[str, str]]:
+    """Memoized core of infer_ido_morphology: (pos, paradigm) or None."""
+    lemma_lower = lemma.lower().strip()
+    
+    # Skip very short words
+    if len(lemma_lower) < 2:
+        return None
+    
+    # Two-letter (verb) endings first, then one-letter endings
+    hit = IDO_SUFFIXES_2.get(lemma_lower[-2:]) or IDO_SUFFIXES_1.get(lemma_lower[-1])
+    if hit is None or len(lemma_lower) < hit[2]:
+        # Unknown
+        return None
+    
+    # Skip function words - let higher-priority sources handle them.
+    # The per-character isalpha() scan only runs for words with a known ending.
+    if lemma_lower in FUNCTION_WORDS or not lemma_lower.isalpha():
+        return None
+    
+    return hit[0], hit[1]
+
+
 def infer_ido_morphology(lemma: str) -> Dict[str, str]:
     """
     Infer POS and paradigm from Ido word endings.
@@ -54,85 +101,42 @@ def infer_ido_morphology(lemma: str) -> Dict[str, str]:
     - Verbs end in -ar (infinitive), -as (present), -is (past), -os (future)
     
     Function words are excluded - they have specific POS that can't be inferred.
+    Results are cached per word; a new dict is returned on every call.
     """
-    lemma_lower = lemma.lower().strip()
-    
-    # Skip function words - let higher-priority sources handle them
-    if lemma_lower in FUNCTION_WORDS:
+    result = _ido_pos_paradigm(lemma)
+    if result is None:
         return {}
-    
-    # Skip very short words or non-alphabetic
-    if len(lemma_lower) < 2 or not lemma_lower.isalpha():
-        return {}
-    
-    # Verb infinitives
-    if lemma_lower.endswith('ar'):
-        return {'pos': 'vblex', 'paradigm': 'ar__vblex'}
-    
-    # Verb conjugated forms - convert to infinitive base
-    if lemma_lower.endswith('as') and len(lemma_lower) > 3:
-        return {'pos': 'vblex', 'paradigm': 'ar__vblex'}
-    
-    if lemma_lower.endswith('is') and len(lemma_lower) > 3:
-        return {'pos': 'vblex', 'paradigm': 'ar__vblex'}
-    
-    if lemma_lower.endswith('os') and len(lemma_lower) > 3:
-        return {'pos': 'vblex', 'paradigm': 'ar__vblex'}
-    
-    if lemma_lower.endswith('us') and len(lemma_lower) > 3:
-        return {'pos': 'vblex', 'paradigm': 'ar__vblex'}
-    
-    if lemma_lower.endswith('ez') and len(lemma_lower) > 3:
-        return {'pos': 'vblex', 'paradigm': 'ar__vblex'}
-    
-    # Nouns (singular -o)
-    if lemma_lower.endswith('o'):
-        return {'pos': 'n', 'paradigm': 'o__n'}
-    
-    # Nouns (plural -i) - could also be other things, be conservative
-    if lemma_lower.endswith('i') and len(lemma_lower) > 2:
-        return {'pos': 'n', 'paradigm': 'o__n'}
-    
-    # Adjectives
-    if lemma_lower.endswith('a'):
-        return {'pos': 'adj', 'paradigm': 'a__adj'}
-    
-    # Adverbs
-    if lemma_lower.endswith('e') and len(lemma_lower) > 2:
-        return {'pos': 'adv', 'paradigm': 'e__adv'}
-    
-    # Unknown
-    return {}
+    return {'pos': result[0], 'paradigm': result[1]}
 
 
-def similarity_to_confidence(similarity: float) -> float:
+def similarity_to_confidence(similarity):
     """
     Convert BERT similarity score to confidence score.
     
     Cap at 0.85 since embeddings are less certain than human-curated sources.
+    Accepts a single score or a NumPy array of scores.
     """
-    return min(similarity * 0.90, 0.85)
+    return np.minimum(similarity * 0.90, 0.85)
 
 
 def convert_bert_to_unified(
     input_path: Path,
     output_path: Path,
     min_similarity: float = 0.85,
-    max_candidates: int = 3
+    max_candidates: int = 3,
+    assume_sorted: bool = False
 ) -> Dict[str, Any]:
     """
     Convert BERT translation candidates to unified format.
+    
+    With assume_sorted, each word's candidates are taken to be sorted by
+    similarity descending, so scanning stops at the first candidate below
+    min_similarity or once max_candidates are kept.
     """
     print(f"Loading BERT translations from {input_path}...")
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        bert_data = json.load(f)
-    
-    print(f"Found {len(bert_data)} Ido words with translation candidates")
-    
-    entries = []
     stats = {
-        'total_words': len(bert_data),
+        'total_words': 0,
         'words_with_translations': 0,
         'words_with_morphology': 0,
         'total_translations': 0,
@@ -140,93 +144,124 @@ def convert_bert_to_unified(
         'skipped_invalid': 0
     }
     
-    for ido_word, candidates in bert_data.items():
-        # Skip invalid entries
-        if not ido_word or not isinstance(candidates, list):
-            stats['skipped_invalid'] += 1
-            continue
-        
-        # Skip special characters or very short words
-        if len(ido_word) < 2 or ido_word.startswith('*') or ido_word == '-':
-            stats['skipped_invalid'] += 1
-            continue
-        
-        # Filter candidates by similarity
-        valid_candidates = [
-            c for c in candidates 
-            if c.get('similarity', 0) >= min_similarity
-        ][:max_candidates]
-        
-        if not valid_candidates:
-            stats['skipped_low_similarity'] += 1
-            continue
-        
-        # Build translations array
-        translations = []
-        for candidate in valid_candidates:
-            epo_word = candidate.get('epo', '')
-            similarity = candidate.get('similarity', 0)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Entries are written to a scratch file as they are produced; the
+    # metadata (which needs the final counts) goes in front of them at the end
+    with tempfile.TemporaryFile(dir=output_path.parent) as entries_file:
+        for ido_word, candidates in iter_bert_candidates(input_path):
+            stats['total_words'] += 1
             
-            if not epo_word or len(epo_word) < 2:
+            # Skip invalid entries
+            if not ido_word or not isinstance(candidates, list):
+                stats['skipped_invalid'] += 1
                 continue
             
-            translations.append({
-                'term': epo_word,
-                'lang': 'eo',
-                'confidence': round(similarity_to_confidence(similarity), 3),
-                'source': 'bert_embeddings'
-            })
-        
-        if not translations:
-            continue
-        
-        # Infer morphology
-        morphology = infer_ido_morphology(ido_word)
-        
-        # Build entry
-        entry = {
-            'lemma': ido_word,
-            'source': 'bert_embeddings',
-            'translations': translations
-        }
+            # Skip special characters or very short words
+            if len(ido_word) < 2 or ido_word.startswith('*') or ido_word == '-':
+                stats['skipped_invalid'] += 1
+                continue
+            
+            # Filter candidates by similarity: first max_candidates above threshold
+            if assume_sorted:
+                # Ranked best-first: stop at the limit or the first weak candidate
+                valid_idx = []
+                for c in candidates:
+                    if len(valid_idx) >= max_candidates or c.get('similarity', 0) < min_similarity:
+                        break
+                    valid_idx.append(len(valid_idx))
+                valid_similarities = np.fromiter(
+                    (candidates[i].get('similarity', 0) for i in valid_idx),
+                    dtype=np.float64,
+                    count=len(valid_idx)
+                )
+            else:
+                similarities = np.fromiter(
+                    (c.get('similarity', 0) for c in candidates),
+                    dtype=np.float64,
+                    count=len(candidates)
+                )
+                valid_idx = np.flatnonzero(similarities >= min_similarity)[:max_candidates]
+                valid_similarities = similarities[valid_idx]
+                valid_idx = valid_idx.tolist()
+            
+            if not valid_idx:
+                stats['skipped_low_similarity'] += 1
+                continue
+            
+            confidences = np.round(similarity_to_confidence(valid_similarities), 3).tolist()
+            
+            # Build translations array
+            translations = []
+            for i, confidence in zip(valid_idx, confidences):
+                epo_word = candidates[i].get('epo', '')
+                
+                if not epo_word or len(epo_word) < 2:
+                    continue
+                
+                translations.append({
+                    'term': epo_word,
+                    'lang': 'eo',
+                    'confidence': confidence,
+                    'source': 'bert_embeddings'
+                })
+            
+            if not translations:
+                continue
+            
+            # Infer morphology
+            morphology = infer_ido_morphology(ido_word)
+            
+            # Build entry
+            entry = {
+                'lemma': ido_word,
+                'source': 'bert_embeddings',
+                'translations': translations
+            }
+            
+            if morphology:
+                entry['pos'] = morphology.get('pos')
+                entry['morphology'] = {'paradigm': morphology.get('paradigm')}
+                stats['words_with_morphology'] += 1
+            
+            entries_file.write(b',\n    ' if stats['words_with_translations'] else b'\n    ')
+            entries_file.write(dump_json(entry, indent_level=4))
+            stats['words_with_translations'] += 1
+            stats['total_translations'] += len(translations)
         
-        if morphology:
-            entry['pos'] = morphology.get('pos')
-            entry['morphology'] = {'paradigm': morphology.get('paradigm')}
-            stats['words_with_morphology'] += 1
+        print(f"Found {stats['total_words']} Ido words with translation candidates")
+        entries_count = stats['words_with_translations']
         
-        entries.append(entry)
-        stats['words_with_translations'] += 1
-        stats['total_translations'] += len(translations)
-    
-    # Build unified format
-    unified_data = {
-        'metadata': {
+        metadata = {
             'source_name': 'bert_embeddings',
             'version': '1.0',
             'generation_date': datetime.now().isoformat(),
             'description': 'Translation pairs from BERT embedding alignment (XLM-RoBERTa fine-tuned on Ido)',
             'min_similarity_threshold': min_similarity,
             'statistics': {
-                'total_entries': len(entries),
+                'total_entries': entries_count,
                 'entries_with_translations': stats['words_with_translations'],
                 'entries_with_morphology': stats['words_with_morphology'],
                 'total_translations': stats['total_translations']
             }
-        },
-        'entries': entries
-    }
-    
-    # Write output
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(unified_data, f, indent=2, ensure_ascii=False)
+        }
+        
+        # Write output: {"metadata": ..., "entries": [...]} laid out like json.dump(indent=2)
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(b'{\n  "metadata": ')
+            f.write(dump_json(metadata, indent_level=2))
+            f.write(b',\n  "entries": [')
+            if entries_count:
+                entries_file.seek(0)
+                shutil.copyfileobj(entries_file, f, 1 << 20)
+                f.write(b'\n  ')
+            f.write(b']\n}')
     
     print(f"\n{'='*60}")
     print(f"CONVERSION COMPLETE")
     print(f"{'='*60}")
     print(f"Output: {output_path}")
-    print(f"Entries: {len(entries):,}")
+    print(f"Entries: {entries_count:,}")
     print(f"With morphology: {stats['words_with_morphology']:,}")
     print(f"Translations: {stats['total_translations']:,}")
     print(f"Skipped (low similarity): {stats['skipped_low_similarity']:,}")
@@ -263,6 +298,11 @@ def main():
         default=3,
         help='Maximum translation candidates per word (default: 3)'
     )
+    parser.add_argument(
+        '--assume-sorted',
+        action='store_true',
+        help='Candidates are sorted by similarity (descending); stop scanning at the first weak one'
+    )
     
     args = parser.parse_args()
     
@@ -274,7 +314,8 @@ def main():
         args.input,
         args.output,
         args.min_similarity,
-        args.max_candidates
+        args.max_candidates,
+        args.assume_sorted
     )
 
 
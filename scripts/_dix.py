@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Shared reading and writing of Apertium .dix files (scripts 17, 18 and the
+dictionary regeneration/filter scripts).
+
+ET is lxml.etree when lxml is installed and xml.etree.ElementTree otherwise.
+write_dix_document accepts trees built with either library, so scripts that
+build their entries with xml.etree can share it. parse_dix keeps comments
+with both libraries, since generated entries carry their similarity score
+in one.
+"""
+
+from xml.etree import ElementTree
+
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    ET = ElementTree
+    HAVE_LXML = False
+
+
+def parse_dix(file_path):
+    """Parse a .dix file, keeping comments; returns the ElementTree."""
+    if HAVE_LXML:
+        # libxml2 parser; blank text is dropped so entries re-indent cleanly
+        return ET.parse(str(file_path), ET.XMLParser(remove_blank_text=True))
+    # xml.etree drops comments unless the tree builder is asked to keep them
+    parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
+    return ET.parse(file_path, parser)
+
+
+def write_dix_document(root, output_file) -> None:
+    """
+    Indent a .dix tree in place and write it with an XML declaration.
+
+    The skeleton is indented with ET.indent; each <e> is kept on a single
+    line so no whitespace ends up inside <l>/<r>.
+    """
+    # Serialize with the library the tree was built with
+    et = ElementTree if isinstance(root, ElementTree.Element) else ET
+
+    et.indent(root, space="  ")
+    for entry in root.iter('e'):
+        for node in entry.iter():
+            if node.text and not node.text.strip():
+                node.text = None
+            if node is not entry and node.tail and not node.tail.strip():
+                node.tail = None
+
+    # Serialize straight into the file instead of building the document as a string
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+        et.ElementTree(root).write(f, encoding='utf-8', xml_declaration=False)
+        f.write(b'\n')
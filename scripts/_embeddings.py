@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Shared case-variant merging for the embedding cleaning scripts
+(clean_and_project_bert.py and clean_esperanto_embeddings.py).
+"""
+
+import numpy as np
+from typing import List, Tuple
+from scipy import sparse
+
+
+def group_case_variants(words: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Number each word's lowercase form in order of first appearance.
+
+    Returns (group_ids, lowercase_words), where group_ids[i] indexes
+    lowercase_words. A dict does this in one hashing pass; np.unique would
+    sort the strings and lose the order.
+    """
+    group_of = {}
+    group_ids = np.fromiter(
+        (group_of.setdefault(lower, len(group_of)) for lower in map(str.lower, words)),
+        dtype=np.int64, count=len(words)
+    )
+    return group_ids, list(group_of)
+
+
+def average_groups(embeddings: np.ndarray, group_ids: np.ndarray) -> np.ndarray:
+    """
+    Average the rows of embeddings that share a group id.
+
+    A sparse 0/1 group-membership matrix times the rows gives the group
+    sums, which are divided by the group sizes. Row g of the result is the
+    mean of group g; group ids must be 0..n_groups-1.
+    """
+    n_groups = int(group_ids.max()) + 1 if len(group_ids) else 0
+    membership = sparse.csr_matrix(
+        (np.ones(len(group_ids), dtype=embeddings.dtype), (group_ids, np.arange(len(group_ids)))),
+        shape=(n_groups, len(group_ids))
+    )
+    averaged = np.asarray(membership @ embeddings)
+    averaged /= np.bincount(group_ids, minlength=n_groups)[:, None]
+    return averaged
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Shared load/filter stage for the BERT candidate formatters (scripts 16 and 17),
+and the JSON load/save, output-file and vocabulary tokenization helpers used
+across the scripts.
+
+Both formatters read the same translation candidate JSON and apply the same
+similarity/max-candidates filter. load_and_filter() can cache the filtered
+result on disk as a pickle (opt-in, via the formatters' --cache-dir), so running
+several formatters over one candidate file parses and filters it only once.
+
+Candidates are held per Ido word as parallel arrays rather than one dict per
+candidate:
+
+    {"ido_word": {"epo": ["epo_word", ...], "sim": np.array([0.95, ...])}}
+"""
+
+import os
+import json
+import mmap
+import pickle
+import hashlib
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Bump when the cached payload layout changes
+CACHE_VERSION = 3
+
+# Per-word candidates: {'epo': List[str], 'sim': np.ndarray of float64}
+Candidates = Dict[str, Any]
+
+
+def to_candidate_arrays(candidates: List[Dict]) -> Candidates:
+    """
+    Convert a list of candidate dicts to parallel epo/sim arrays.
+
+    The Esperanto word is read from 'translation' or, failing that, 'epo'.
+    Similarities stay float64 so rounded output and threshold ties match the
+    JSON values exactly.
+    """
+    return {
+        'epo': [c['translation'] if 'translation' in c else c.get('epo', '') for c in candidates],
+        'sim': np.fromiter((c['similarity'] for c in candidates),
+                           dtype=np.float64, count=len(candidates)),
+    }
+
+
+def load_translation_candidates(input_file: str) -> Dict[str, Candidates]:
+    """
+    Load translation candidates from JSON.
+
+    With orjson installed, the file is memory-mapped and parsed straight
+    from the page cache instead of being copied into a Python string first.
+    Each word's candidate list is converted to parallel arrays (see
+    to_candidate_arrays), which also normalizes 'translation' keys to 'epo'.
+    """
+    print(f"Loading translation candidates from {input_file}...")
+    if orjson is not None:
+        with open(input_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            data = orjson.loads(view)
+    else:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    for ido_word, candidates in data.items():
+        data[ido_word] = to_candidate_arrays(candidates)
+    print(f"✅ Loaded {len(data)} Ido words with candidates")
+    return data
+
+
+def load_json(file_path) -> Any:
+    """Load a JSON file (parsed with orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(Path(file_path).read_bytes())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(data: Any, output_file) -> None:
+    """
+    Write data as indented UTF-8 JSON (serialized with orjson when installed).
+
+    Non-string dict keys are written as strings with either backend, as
+    json.dump does.
+    """
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        # json.dump emits many small fragments; batch them in a 1 MiB buffer
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+@contextmanager
+def replace_on_success(output_file, mode: str = 'wb', **open_kwargs):
+    """
+    Write to a temporary file next to output_file, moved into place on success.
+
+    If the block raises, the temporary file is deleted and an existing
+    output_file is left as it was. This also allows the output to overwrite
+    the file that is being read.
+    """
+    output_file = Path(output_file)
+    tmp = tempfile.NamedTemporaryFile(mode, dir=output_file.parent, prefix=f'.{output_file.name}.',
+                                      suffix='.tmp', delete=False, **open_kwargs)
+    try:
+        with tmp as f:
+            yield f
+        # NamedTemporaryFile creates the file 0600; give it the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp.name, 0o666 & ~umask)
+        os.replace(tmp.name, output_file)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+
+
+def dump_json(data: Any, indent_level: int = 0) -> bytes:
+    """
+    Serialize data as indented UTF-8 JSON (with orjson when installed).
+
+    Continuation lines are shifted right by indent_level spaces, so the
+    result can be spliced into an enclosing document at that depth.
+    """
+    if orjson is not None:
+        buf = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        buf = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    if indent_level:
+        buf = buf.replace(b'\n', b'\n' + b' ' * indent_level)
+    return buf
+
+
+def iter_bert_candidates(input_path: Path) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (ido_word, candidates) pairs from a candidates JSON file.
+
+    With ijson installed the file is parsed incrementally, so only one
+    word's candidates are held in memory at a time; otherwise the whole
+    file is loaded first.
+    """
+    if ijson is not None:
+        with open(input_path, 'rb') as f:
+            yield from ijson.kvitems(f, '', use_float=True)
+    else:
+        yield from load_json(input_path).items()
+
+
+def tokenize_vocabulary(
+    tokenizer,
+    words: List[str],
+    cache_dir: Optional[Path] = None,
+    max_length: int = 32
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tokenize the whole vocabulary once, padded to the longest word.
+    
+    With cache_dir, input_ids/attention_mask are stored as {key}.npz, where
+    key hashes the tokenizer (its path, class and vocabulary), max_length and
+    the word list, and reused on re-runs (scripts 14 and 15 share these
+    files). A retrained tokenizer saved to the same path gets a new key.
+    """
+    cache_file = None
+    if cache_dir is not None:
+        vocab = sorted(tokenizer.get_vocab().items(), key=lambda item: item[1])
+        vocab_sha = hashlib.sha1(
+            "\n".join(f"{token}\t{idx}" for token, idx in vocab).encode('utf-8')
+        ).hexdigest()
+        payload = (f"{tokenizer.name_or_path}|{type(tokenizer).__name__}|{vocab_sha}|"
+                   f"{max_length}|" + "\n".join(words))
+        key = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        cache_file = Path(cache_dir) / f"{key}.npz"
+        
+        if cache_file.exists():
+            print(f"Loading cached tokens from {cache_file}")
+            data = np.load(cache_file)
+            return data['input_ids'], data['attention_mask']
+    
+    print(f"Tokenizing {len(words):,} words...")
+    encoded = tokenizer(
+        words,
+        padding=True,
+        truncation=True,
+        max_length=max_length,  # Words shouldn't be longer
+        return_tensors="np"
+    )
+    input_ids = encoded['input_ids']
+    attention_mask = encoded['attention_mask']
+    
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cache_file, input_ids=input_ids, attention_mask=attention_mask)
+        print(f"Cached tokens to {cache_file}")
+    
+    return input_ids, attention_mask
+
+
+def count_above_threshold(sims: np.ndarray, min_similarity: float, limit: int) -> int:
+    """
+    Binary-search how many leading similarities reach min_similarity.
+
+    sims must be sorted descending. Only the first limit entries are searched.
+    """
+    lo, hi = 0, min(len(sims), limit)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if sims[mid] >= min_similarity:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def chunk_items(items: List, chunk_size: int) -> List[List]:
+    """Split items into consecutive chunks of at most chunk_size."""
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def map_chunks(func: Callable, chunks: List, *args, workers: int = 1) -> Iterator:
+    """
+    Yield func(chunk, *args) for every chunk, in order.
+
+    With workers > 1 the chunks are processed by a process pool; results are
+    still yielded in input order.
+    """
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(func, chunks, *(repeat(arg) for arg in args))
+    else:
+        for chunk in chunks:
+            yield func(chunk, *args)
+
+
+def select_candidates(candidates: Candidates, min_similarity: float,
+                      max_candidates: int, assume_sorted: bool = False) -> Optional[Candidates]:
+    """
+    Keep the first max_candidates candidates reaching min_similarity.
+
+    Returns None when no candidate qualifies. With assume_sorted the
+    similarities are taken to be sorted descending and the arrays are sliced
+    at a binary-searched cutoff instead of masked.
+    """
+    sims = candidates['sim']
+    if assume_sorted:
+        cutoff = count_above_threshold(sims, min_similarity, max_candidates)
+        if cutoff <= 0:
+            return None
+        return {'epo': candidates['epo'][:cutoff], 'sim': sims[:cutoff]}
+    
+    idx = np.flatnonzero(sims >= min_similarity)[:max(max_candidates, 0)]
+    if not len(idx):
+        return None
+    epo = candidates['epo']
+    return {'epo': [epo[i] for i in idx], 'sim': sims[idx]}
+
+
+def _filter_chunk(items, min_similarity, max_candidates, assume_sorted):
+    """Filter one chunk of (ido_word, candidates) pairs; returns the kept pairs."""
+    kept = []
+    for ido_word, candidates in items:
+        selected = select_candidates(candidates, min_similarity, max_candidates, assume_sorted)
+        if selected is not None:
+            kept.append((ido_word, selected))
+    return kept
+
+
+def filter_candidates(
+    data: Dict[str, Candidates],
+    min_similarity: float = 0.85,
+    max_candidates: int = 3,
+    assume_sorted: bool = False,
+    workers: int = 1,
+    chunk_size: int = 10000
+) -> Dict[str, Candidates]:
+    """
+    Filter candidates by similarity threshold and limit count.
+
+    With assume_sorted, each word's candidates are taken to be sorted by
+    similarity descending (as written by the BERT alignment), so the cutoff
+    is found by binary search and the arrays are sliced instead of masked.
+    With workers > 1, chunks of chunk_size words are filtered in parallel.
+    """
+    print(f"\nFiltering candidates (min_sim={min_similarity}, max={max_candidates})...")
+
+    filtered = {}
+    total_before = sum(len(candidates['sim']) for candidates in data.values())
+
+    chunks = chunk_items(list(data.items()), chunk_size)
+    for kept in map_chunks(_filter_chunk, chunks, min_similarity, max_candidates,
+                           assume_sorted, workers=workers):
+        filtered.update(kept)
+
+    total_after = sum(len(candidates['sim']) for candidates in filtered.values())
+
+    print(f"✅ Filtered: {len(filtered)} Ido words, {total_after} total pairs")
+    if total_before:
+        print(f"   Reduction: {total_before} → {total_after} ({100*(total_before-total_after)/total_before:.1f}% removed)")
+
+    return filtered
+
+
+def cache_path(input_file: str, min_similarity: float, max_candidates: int,
+               assume_sorted: bool, cache_dir: Path) -> Path:
+    """Cache file for (input path, mtime, size, filter settings)."""
+    stat = Path(input_file).stat()
+    key = '|'.join([
+        str(CACHE_VERSION),
+        str(Path(input_file).resolve()),
+        str(stat.st_mtime_ns),
+        str(stat.st_size),
+        repr(float(min_similarity)),
+        str(max_candidates),
+        str(assume_sorted),
+    ])
+    return cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pickle"
+
+
+def load_and_filter(
+    input_file: str,
+    min_similarity: float,
+    max_candidates: int,
+    cache_dir: Optional[str] = None,
+    assume_sorted: bool = False,
+    workers: int = 1
+) -> Tuple[Dict[str, Candidates], int]:
+    """
+    Load and filter translation candidates, optionally via an on-disk cache.
+
+    Returns the filtered candidates and the number of Ido words in the
+    unfiltered input. With cache_dir set, the result is cached there keyed
+    on the input file and filter settings; without it nothing is cached.
+    workers is passed on to filter_candidates.
+
+    Cache files are pickles and are unpickled when found, so cache_dir
+    must be a directory only trusted users can write to. A cache that
+    cannot be written is skipped with a warning.
+    """
+    cache_file = None
+    if cache_dir:
+        cache_file = cache_path(input_file, min_similarity, max_candidates,
+                                assume_sorted, Path(cache_dir))
+        if cache_file.exists():
+            print(f"Loading filtered candidates from cache {cache_file}...")
+            with open(cache_file, 'rb') as f:
+                filtered, total_words = pickle.load(f)
+            print(f"✅ Loaded {len(filtered)} filtered Ido words ({total_words} in input)")
+            return filtered, total_words
+
+    data = load_translation_candidates(input_file)
+    total_words = len(data)
+    filtered = filter_candidates(data, min_similarity, max_candidates, assume_sorted,
+                                 workers=workers)
+    del data
+
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write under a temporary name so a concurrent reader never sees a partial file
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb', buffering=1 << 20) as f:
+                pickle.dump((filtered, total_words), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(cache_file)
+        except OSError as e:
+            print(f"⚠️  Could not write cache {cache_file}: {e}")
+
+    return filtered, total_words
@@ -4,141 +4,136 @@ Add missing words to Apertium dictionary for sentence translation improvement.
 """
 
 import argparse
+import re
+from collections import namedtuple
 from pathlib import Path
+from typing import Iterable, List, Set
 from xml.etree import ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape, quoteattr
+
+# Opening <section ...> tags, for locating the insertion point without a parse
+SECTION_OPEN_RE = re.compile(rb'<section\b[^>]*>')
+MAIN_SECTION_ID_RE = re.compile(rb'\bid\s*=\s*["\']main["\']')
+
+# A bidix entry to add: Ido word, Esperanto translation, paradigm, POS tag, comment
+MissingWord = namedtuple('MissingWord', 'ido epo paradigm pos comment')
 
 # Missing words and their translations
-MISSING_WORDS = {
-    'partoprenis': {
-        'epo': 'partoprenis',
-        'paradigm': 'is__vblex',
-        'pos': 'vblex',
-        'comment': 'past tense of partoprenar (to participate)'
-    },
-    'vorti': {
-        'epo': 'vortoj',
-        'paradigm': 'i__n_pl',
-        'pos': 'n',
-        'comment': 'plural of vorto (words)'
-    },
-    'detali': {
-        'epo': 'detaloj',
-        'paradigm': 'i__n_pl',
-        'pos': 'n',
-        'comment': 'plural of detalo (details)'
-    },
-    'questiono': {
-        'epo': 'demando',
-        'paradigm': 'o__n',
-        'pos': 'n',
-        'comment': 'question'
-    },
-    'remplacigar': {
-        'epo': 'anstataŭigi',
-        'paradigm': 'ar__vblex',
-        'pos': 'vblex',
-        'comment': 'to replace'
-    },
-    'adjuntar': {
-        'epo': 'aldoni',
-        'paradigm': 'ar__vblex',
-        'pos': 'vblex',
-        'comment': 'to add/attach'
-    },
-    'existanta': {
-        'epo': 'ekzistantaj',
-        'paradigm': 'anta__adj',
-        'pos': 'adj',
-        'comment': 'existing (present participle adjective)'
-    }
-}
+MISSING_WORDS = [
+    MissingWord('partoprenis', 'partoprenis', 'is__vblex', 'vblex',
+                'past tense of partoprenar (to participate)'),
+    MissingWord('vorti', 'vortoj', 'i__n_pl', 'n', 'plural of vorto (words)'),
+    MissingWord('detali', 'detaloj', 'i__n_pl', 'n', 'plural of detalo (details)'),
+    MissingWord('questiono', 'demando', 'o__n', 'n', 'question'),
+    MissingWord('remplacigar', 'anstataŭigi', 'ar__vblex', 'vblex', 'to replace'),
+    MissingWord('adjuntar', 'aldoni', 'ar__vblex', 'vblex', 'to add/attach'),
+    MissingWord('existanta', 'ekzistantaj', 'anta__adj', 'adj',
+                'existing (present participle adjective)'),
+]
 
-def create_dix_entry(ido_word: str, epo_word: str, paradigm: str, pos: str, comment: str = None):
-    """Create a .dix entry element."""
-    entry = ET.Element('e')
-    
-    if comment:
-        comment_elem = ET.Comment(f' {comment} ')
-        entry.append(comment_elem)
-    
-    pair = ET.SubElement(entry, 'p')
-    left = ET.SubElement(pair, 'l')
-    right = ET.SubElement(pair, 'r')
+def create_dix_entry(ido_word: str, epo_word: str, paradigm: str, pos: str, comment: str = None) -> str:
+    """Create a .dix entry as a single line of XML text."""
+    comment_xml = f'<!-- {comment} -->' if comment else ''
+    pos_attr = quoteattr(pos)
+    return (f'<e>{comment_xml}<p>'
+            f'<l>{escape(ido_word)}<s n={pos_attr}/></l>'
+            f'<r>{escape(epo_word)}<s n={pos_attr}/></r>'
+            f'</p></e>')
+
+def read_section_lemmas(dix_file: Path, lemma_tag: str) -> Set[str]:
+    """
+    Collect the lemmas of the entries in the main section (or the first
+    section if there is no main one) with a single iterparse pass.
+    
+    lemma_tag is the element holding the lemma: 'l' for a bilingual
+    dictionary, 'i' for a monolingual one. Only 'end' events are needed:
+    lemmas are gathered as their elements close and assigned to a section
+    when it closes. Entries are cleared as soon as they are read, so the
+    whole tree is never held in memory.
+    """
+    lemmas_by_section = {}
+    pending = set()
+    for _, elem in ET.iterparse(str(dix_file), events=('end',)):
+        tag = elem.tag
+        if tag == lemma_tag:
+            if elem.text:
+                pending.add(elem.text.strip())
+        elif tag == 'e':
+            elem.clear()
+        elif tag == 'section':
+            lemmas_by_section.setdefault(elem.get('id', ''), set()).update(pending)
+            pending = set()
+            elem.clear()
+        elif tag == 'pardef':
+            # Paradigm entries are not dictionary words
+            pending = set()
+    
+    if not lemmas_by_section:
+        raise ValueError("No section found in dictionary")
+    if 'main' in lemmas_by_section:
+        return lemmas_by_section['main']
+    return next(iter(lemmas_by_section.values()))
+
+def insert_entries(dix: bytes, entries: Iterable[str]) -> bytes:
+    """
+    Insert serialized <e> entries at the end of the main section.
+    
+    The rest of the file is copied through byte for byte; only the new
+    entries (one per line, indented like section children) are added before
+    the </section> that closes the main section (or the first section).
+    """
+    openings = list(SECTION_OPEN_RE.finditer(dix))
+    if not openings:
+        raise ValueError("No section found in dictionary")
+    opening = next((m for m in openings if MAIN_SECTION_ID_RE.search(m.group())), openings[0])
+    if opening.group().endswith(b'/>'):
+        raise ValueError("Main section is empty (<section/>); cannot insert entries")
     
-    left.text = ido_word
-    s_left = ET.SubElement(left, 's')
-    s_left.set('n', pos)
+    close = dix.find(b'</section>', opening.end())
+    if close < 0:
+        raise ValueError("Main section is not closed")
     
-    right.text = epo_word
-    s_right = ET.SubElement(right, 's')
-    s_right.set('n', pos)
+    new_entries = b''.join(f'    {entry}\n'.encode('utf-8') for entry in entries)
     
-    return entry
+    # Insert on a line of its own before the closing tag's indentation
+    line_start = dix.rfind(b'\n', 0, close) + 1
+    if dix[line_start:close].strip():
+        return dix[:close] + b'\n' + new_entries + dix[close:]
+    return dix[:line_start] + new_entries + dix[line_start:]
 
-def add_words_to_dix(dix_file: Path, output_file: Path, words: dict):
-    """Add missing words to .dix file."""
+def add_words_to_dix(dix_file: Path, output_file: Path, words: List[MissingWord]):
+    """
+    Add missing words to .dix file.
+    
+    The existing dictionary is scanned once for its lemmas and otherwise
+    copied through unchanged, with the new entries appended to its main
+    section.
+    """
     print(f"Loading dictionary from {dix_file}...")
-    tree = ET.parse(dix_file)
-    root = tree.getroot()
-    
-    # Find main section
-    main_section = root.find('.//section[@id="main"]')
-    if main_section is None:
-        main_section = root.find('.//section')
-    
-    if main_section is None:
-        raise ValueError("No section found in dictionary")
-    
-    # Get existing words
-    existing_words = set()
-    for entry in main_section.findall('e'):
-        l_elem = entry.find('.//l')
-        if l_elem is not None and l_elem.text:
-            existing_words.add(l_elem.text.strip())
+    existing_words = read_section_lemmas(dix_file, 'l')
     
     print(f"Found {len(existing_words)} existing entries")
     
     # Add missing words
     added = 0
     skipped = 0
+    new_entries = []
     
-    for ido_word, word_data in words.items():
-        if ido_word in existing_words:
-            print(f"  ⏭️  Skipping {ido_word} (already exists)")
+    for word in words:
+        if word.ido in existing_words:
+            print(f"  ⏭️  Skipping {word.ido} (already exists)")
             skipped += 1
             continue
         
-        epo_word = word_data['epo']
-        paradigm = word_data['paradigm']
-        pos = word_data['pos']
-        comment = word_data.get('comment', '')
-        
-        entry = create_dix_entry(ido_word, epo_word, paradigm, pos, comment)
-        main_section.append(entry)
-        print(f"  ✅ Added {ido_word} → {epo_word} ({pos})")
+        new_entries.append(create_dix_entry(word.ido, word.epo, word.paradigm, word.pos, word.comment))
+        print(f"  ✅ Added {word.ido} → {word.epo} ({word.pos})")
         added += 1
     
     print(f"\nAdded {added} words, skipped {skipped}")
     
     # Save dictionary
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Pretty print
-    xml_string = ET.tostring(root, encoding='unicode')
-    reparsed = minidom.parseString(xml_string)
-    pretty_xml = reparsed.toprettyxml(indent="  ")
-    
-    # Remove extra newlines
-    lines = [line for line in pretty_xml.split('\n') if line.strip()]
-    xml_string = '\n'.join(lines)
-    
-    # Ensure XML declaration
-    if not xml_string.startswith('<?xml'):
-        xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_string
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(xml_string)
+    output_file.write_bytes(insert_entries(dix_file.read_bytes(), new_entries))
     
     print(f"\n✅ Saved dictionary to {output_file}")
 
@@ -155,7 +150,7 @@ def main():
     
     words_to_add = MISSING_WORDS
     if args.words:
-        words_to_add = {k: v for k, v in MISSING_WORDS.items() if k in args.words}
+        words_to_add = [w for w in MISSING_WORDS if w.ido in args.words]
     
     add_words_to_dix(args.dix, args.output, words_to_add)
 
@@ -4,8 +4,9 @@ Add missing words to monolingual Ido dictionary.
 """
 
 from pathlib import Path
-from xml.etree import ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape, quoteattr
+
+from add_missing_words import read_section_lemmas, insert_entries
 
 # Words to add with their paradigms
 WORDS_TO_ADD = {
@@ -19,31 +20,22 @@ WORDS_TO_ADD = {
 }
 
 def add_words_to_monolingual(dix_file: Path, output_file: Path, words: dict):
-    """Add words to monolingual dictionary."""
-    print(f"Loading monolingual dictionary from {dix_file}...")
-    tree = ET.parse(dix_file)
-    root = tree.getroot()
-    
-    # Find main section
-    main_section = root.find('.//section[@id="main"]')
-    if main_section is None:
-        main_section = root.find('.//section')
+    """
+    Add words to monolingual dictionary.
     
-    if main_section is None:
-        raise ValueError("No section found in dictionary")
-    
-    # Get existing words
-    existing_words = set()
-    for entry in main_section.findall('e'):
-        i_elem = entry.find('i')
-        if i_elem is not None and i_elem.text:
-            existing_words.add(i_elem.text.strip())
+    The existing dictionary is scanned once for its lemmas and otherwise
+    copied through unchanged, with the new entries appended to its main
+    section.
+    """
+    print(f"Loading monolingual dictionary from {dix_file}...")
+    existing_words = read_section_lemmas(dix_file, 'i')
     
     print(f"Found {len(existing_words)} existing entries")
     
     # Add missing words
     added = 0
     skipped = 0
+    new_entries = []
     
     for word, paradigm in words.items():
         if word in existing_words:
@@ -52,13 +44,9 @@ def add_words_to_monolingual(dix_file: Path, output_file: Path, words: dict):
             continue
         
         # Create entry
-        entry = ET.Element('e')
-        lemma = ET.SubElement(entry, 'i')
-        lemma.text = word
-        par = ET.SubElement(entry, 'par')
-        par.set('n', paradigm)
-        
-        main_section.append(entry)
+        new_entries.append(
+            f'<e><i>{escape(word)}</i><par n={quoteattr(paradigm)}/></e>'
+        )
         print(f"  ✅ Added {word} (paradigm: {paradigm})")
         added += 1
     
@@ -66,22 +54,7 @@ def add_words_to_monolingual(dix_file: Path, output_file: Path, words: dict):
     
     # Save dictionary
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Pretty print
-    xml_string = ET.tostring(root, encoding='unicode')
-    reparsed = minidom.parseString(xml_string)
-    pretty_xml = reparsed.toprettyxml(indent="  ")
-    
-    # Remove extra newlines
-    lines = [line for line in pretty_xml.split('\n') if line.strip()]
-    xml_string = '\n'.join(lines)
-    
-    # Ensure XML declaration
-    if not xml_string.startswith('<?xml'):
-        xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_string
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(xml_string)
+    output_file.write_bytes(insert_entries(dix_file.read_bytes(), new_entries))
     
     print(f"\n✅ Saved dictionary to {output_file}")
 
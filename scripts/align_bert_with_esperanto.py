@@ -22,11 +22,36 @@ import json
 import logging
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Tuple
-from gensim.models import Word2Vec
+from typing import Container, Dict, Iterable, Iterator, List, Tuple
+from gensim.models import KeyedVectors, Word2Vec
 from sklearn.metrics.pairwise import cosine_similarity
 from tqdm import tqdm
 import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+from _pipeline import replace_on_success
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,10 +60,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def get_array_module(device: str = 'cpu'):
+    """Array module for device: numpy for 'cpu', cupy for 'cuda'."""
+    if device == 'cuda':
+        if cp is None:
+            raise ImportError("--device cuda requires cupy (pip install cupy-cuda12x)")
+        return cp
+    return np
+
+
+def to_host(array):
+    """Copy a cupy array back to host memory; numpy arrays pass through."""
+    if cp is not None and isinstance(array, cp.ndarray):
+        return cp.asnumpy(array)
+    return array
+
+
 def load_bert_embeddings(npy_path: Path, vocab_path: Path):
     """Load BERT embeddings."""
     logger.info(f"Loading BERT embeddings from {npy_path}")
-    embeddings = np.load(npy_path)
+    # Memory-mapped: pages are read on first touch and shared between processes
+    embeddings = np.load(npy_path, mmap_mode='r')
+    # float32 C-order for BLAS; a no-op (still mapped) when the file already is
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
     
     with open(vocab_path, 'r', encoding='utf-8') as f:
         vocab = [line.strip() for line in f]
@@ -49,8 +93,44 @@ def load_bert_embeddings(npy_path: Path, vocab_path: Path):
     return embeddings, vocab, word_to_idx
 
 
-def load_word2vec_model(model_path: Path, vocab_path: Path = None):
-    """Load Word2Vec model or .npy embeddings."""
+def load_keyed_vectors(model_path: Path, export_kv: bool = False) -> KeyedVectors:
+    """
+    Load the word vectors of a Word2Vec model, memory-mapped.
+    
+    A .kv file is loaded directly, as is an up-to-date sibling .kv of a
+    full .model file. With export_kv, a .model's vectors are also written
+    to that sibling .kv (plus its .vectors.npy), so later runs skip the
+    trainable weights (syn1neg etc.) and map the vector matrix read-only
+    instead of reading it into memory.
+    """
+    if model_path.suffix == '.kv':
+        logger.info(f"Loading word vectors from {model_path}")
+        return KeyedVectors.load(str(model_path), mmap='r')
+    
+    kv_path = model_path.with_suffix('.kv')
+    if kv_path.exists() and kv_path.stat().st_mtime >= model_path.stat().st_mtime:
+        logger.info(f"Loading word vectors from {kv_path}")
+        return KeyedVectors.load(str(kv_path), mmap='r')
+    
+    logger.info(f"Loading Word2Vec model from {model_path}")
+    wv = Word2Vec.load(str(model_path)).wv
+    if not export_kv:
+        return wv
+    try:
+        # Store the matrix as its own .npy so it can be memory-mapped
+        wv.save(str(kv_path), separately=['vectors'])
+        logger.info(f"Saved word vectors to {kv_path} for faster loading")
+    except OSError as e:
+        logger.warning(f"Could not save word vectors to {kv_path}: {e}")
+    return wv
+
+
+def load_word2vec_model(model_path: Path, vocab_path: Path = None, export_kv: bool = False):
+    """
+    Load Word2Vec model (.model or .kv) or .npy embeddings.
+    
+    export_kv is passed on to load_keyed_vectors.
+    """
     if model_path.suffix == '.npy':
         # Load from .npy file (cleaned embeddings)
         logger.info(f"Loading embeddings from {model_path}")
@@ -66,20 +146,25 @@ def load_word2vec_model(model_path: Path, vocab_path: Path = None):
         
         word_to_idx = {word: idx for idx, word in enumerate(vocab)}
     else:
-        # Load from .model file (original Word2Vec)
-        logger.info(f"Loading Word2Vec model from {model_path}")
-        model = Word2Vec.load(str(model_path))
+        # Load from .model/.kv file (original Word2Vec)
+        wv = load_keyed_vectors(model_path, export_kv)
         
-        vocab = list(model.wv.key_to_index.keys())
-        embeddings = model.wv.vectors
-        word_to_idx = model.wv.key_to_index
+        vocab = list(wv.key_to_index.keys())
+        embeddings = wv.vectors
+        word_to_idx = wv.key_to_index
     
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
     logger.info(f"Loaded {len(vocab):,} embeddings, shape: {embeddings.shape}")
     return embeddings, vocab, word_to_idx
 
 
-def load_seed_dictionary(seed_path: Path, ido_vocab: set, epo_vocab: set):
-    """Load seed dictionary (space-separated format)."""
+def load_seed_dictionary(seed_path: Path, ido_vocab: Container[str], epo_vocab: Container[str]):
+    """
+    Load seed dictionary (space-separated format).
+    
+    ido_vocab/epo_vocab only need fast membership tests, e.g. the
+    word-to-index dicts returned by the loaders.
+    """
     logger.info(f"Loading seed dictionary from {seed_path}")
     
     seed_pairs = []
@@ -106,6 +191,57 @@ def load_seed_dictionary(seed_path: Path, ido_vocab: set, epo_vocab: set):
     return seed_pairs
 
 
+def _update_rounds(ids: np.ndarray) -> List[np.ndarray]:
+    """
+    Split update positions into rounds in which every row id occurs once.
+
+    Round r holds the positions of each id's r-th occurrence, so applying the
+    rounds in order reproduces the sequential per-pair updates exactly while
+    each round is a single fancy-indexed assignment.
+    """
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    # Occurrence rank = position within the run of equal ids
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    run_lengths = np.diff(np.r_[starts, len(ids)])
+    ranks = np.empty(len(ids), dtype=np.int64)
+    ranks[order] = np.arange(len(ids)) - np.repeat(starts, run_lengths)
+    return [np.flatnonzero(ranks == r) for r in range(int(ranks.max()) + 1)] if len(ids) else []
+
+
+def _group_by_row(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stable order of positions grouped by row id, plus CSR-style group offsets.
+    
+    Group g covers positions order[ptr[g]:ptr[g + 1]], all with the same id
+    and in their original order.
+    """
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    if not len(ids):
+        starts = starts[:0]
+    return order, np.r_[starts, len(ids)].astype(np.int64)
+
+
+if njit is not None:
+    @njit(parallel=True)
+    def _blend_rows(target, source, target_ids, source_ids, group_ptr, keep, mix):
+        """
+        target[t] = keep * target[t] + mix * source[s] for every (t, s) pair.
+        
+        Pairs arrive grouped by target row (see _group_by_row); each group is
+        handled by one thread in its original order, so rows blended several
+        times get the same result as the sequential loop.
+        """
+        for g in prange(len(group_ptr) - 1):
+            for k in range(group_ptr[g], group_ptr[g + 1]):
+                t = target_ids[k]
+                s = source_ids[k]
+                for d in range(target.shape[1]):
+                    target[t, d] = keep * target[t, d] + mix * source[s, d]
+
+
 def retrofit_embeddings(
     ido_emb: np.ndarray,
     ido_vocab: List[str],
@@ -115,7 +251,8 @@ def retrofit_embeddings(
     epo_idx: Dict[str, int],
     seed_pairs: List[Tuple[str, str]],
     iterations: int = 10,
-    alpha: float = 0.5
+    alpha: float = 0.5,
+    device: str = 'cpu'
 ):
     """
     Retrofit embeddings using seed dictionary.
@@ -123,7 +260,12 @@ def retrofit_embeddings(
     For each iteration:
     - Pull Ido word closer to its Esperanto translation
     - Pull Esperanto word closer to its Ido translation
+    
+    With device='cuda' the updates run on the GPU via CuPy; the aligned
+    embeddings are returned as numpy arrays either way. On the CPU, a
+    parallel Numba kernel does the updates when numba is installed.
     """
+    xp = get_array_module(device)
     logger.info(f"\n{'='*60}")
     logger.info(f"RETROFITTING ALIGNMENT")
     logger.info(f"{'='*60}")
@@ -132,46 +274,76 @@ def retrofit_embeddings(
     logger.info(f"Seed pairs: {len(seed_pairs):,}")
     
     # Copy embeddings
-    ido_aligned = ido_emb.copy()
-    epo_aligned = epo_emb.copy()
+    ido_aligned = xp.array(ido_emb)
+    epo_aligned = xp.array(epo_emb)
+    
+    # Seed pairs as (ido row, epo row); membership does not change between iterations
+    pairs_ii = np.array(
+        [(ido_idx[a], epo_idx[b]) for a, b in seed_pairs if a in ido_idx and b in epo_idx],
+        dtype=np.int64
+    ).reshape(-1, 2)
+    ido_ids = np.ascontiguousarray(pairs_ii[:, 0])
+    epo_ids = np.ascontiguousarray(pairs_ii[:, 1])
+    pairs_xp = xp.asarray(pairs_ii)
+    # Only these rows change after the first iteration
+    touched_ido = xp.asarray(np.unique(ido_ids))
+    touched_epo = xp.asarray(np.unique(epo_ids))
     
     # Track progress
-    initial_sim = compute_seed_similarity(ido_aligned, ido_idx, epo_aligned, epo_idx, seed_pairs)
+    initial_sim = compute_seed_similarity(ido_aligned, epo_aligned, pairs_xp)
     logger.info(f"Initial mean similarity: {initial_sim:.4f}")
     
+    # A word with several translations is blended once per pair, in seed order
+    use_numba = njit is not None and xp is np
+    if use_numba:
+        ido_order, ido_ptr = _group_by_row(ido_ids)
+        epo_order, epo_ptr = _group_by_row(epo_ids)
+        ido_side = (ido_ids[ido_order], epo_ids[ido_order], ido_ptr)
+        epo_side = (epo_ids[epo_order], ido_ids[epo_order], epo_ptr)
+        # Same float32/float64 arithmetic as the numpy expression below
+        keep = ido_aligned.dtype.type(1 - alpha)
+        mix = ido_aligned.dtype.type(alpha)
+    else:
+        ido_rounds = [xp.asarray(sel) for sel in _update_rounds(ido_ids)]
+        epo_rounds = [xp.asarray(sel) for sel in _update_rounds(epo_ids)]
+        ido_ids, epo_ids = xp.asarray(ido_ids), xp.asarray(epo_ids)
+    
     # Retrofitting iterations
     for iteration in range(iterations):
         start_time = time.time()
         
-        # Update Ido embeddings
-        for ido_word, epo_word in seed_pairs:
-            if ido_word in ido_idx and epo_word in epo_idx:
-                ido_i = ido_idx[ido_word]
-                epo_i = epo_idx[epo_word]
-                
-                # Pull Ido word closer to Esperanto translation
+        if use_numba:
+            # Pull Ido words towards Esperanto, then Esperanto towards Ido
+            _blend_rows(ido_aligned, epo_aligned, *ido_side, keep, mix)
+            _blend_rows(epo_aligned, ido_aligned, *epo_side, keep, mix)
+        else:
+            # Pull Ido words closer to their Esperanto translations
+            for sel in ido_rounds:
+                ido_i, epo_i = ido_ids[sel], epo_ids[sel]
                 ido_aligned[ido_i] = (1 - alpha) * ido_aligned[ido_i] + alpha * epo_aligned[epo_i]
-        
-        # Update Esperanto embeddings
-        for ido_word, epo_word in seed_pairs:
-            if ido_word in ido_idx and epo_word in epo_idx:
-                ido_i = ido_idx[ido_word]
-                epo_i = epo_idx[epo_word]
-                
-                # Pull Esperanto word closer to Ido translation
+            
+            # Pull Esperanto words closer to their Ido translations
+            for sel in epo_rounds:
+                ido_i, epo_i = ido_ids[sel], epo_ids[sel]
                 epo_aligned[epo_i] = (1 - alpha) * epo_aligned[epo_i] + alpha * ido_aligned[ido_i]
         
-        # Normalize
-        ido_aligned = ido_aligned / (np.linalg.norm(ido_aligned, axis=1, keepdims=True) + 1e-8)
-        epo_aligned = epo_aligned / (np.linalg.norm(epo_aligned, axis=1, keepdims=True) + 1e-8)
+        # Normalize: everything once, afterwards only the rows that were blended
+        if iteration == 0:
+            ido_aligned = ido_aligned / (xp.linalg.norm(ido_aligned, axis=1, keepdims=True) + 1e-8)
+            epo_aligned = epo_aligned / (xp.linalg.norm(epo_aligned, axis=1, keepdims=True) + 1e-8)
+        else:
+            rows = ido_aligned[touched_ido]
+            ido_aligned[touched_ido] = rows / (xp.linalg.norm(rows, axis=1, keepdims=True) + 1e-8)
+            rows = epo_aligned[touched_epo]
+            epo_aligned[touched_epo] = rows / (xp.linalg.norm(rows, axis=1, keepdims=True) + 1e-8)
         
         # Check progress
-        current_sim = compute_seed_similarity(ido_aligned, ido_idx, epo_aligned, epo_idx, seed_pairs)
+        current_sim = compute_seed_similarity(ido_aligned, epo_aligned, pairs_xp)
         elapsed = time.time() - start_time
         
         logger.info(f"Iteration {iteration+1}/{iterations}: similarity={current_sim:.4f} ({elapsed:.2f}s)")
     
-    final_sim = compute_seed_similarity(ido_aligned, ido_idx, epo_aligned, epo_idx, seed_pairs)
+    final_sim = compute_seed_similarity(ido_aligned, epo_aligned, pairs_xp)
     improvement = final_sim - initial_sim
     
     logger.info(f"\n✅ Retrofitting complete!")
@@ -179,79 +351,423 @@ def retrofit_embeddings(
     logger.info(f"Final similarity: {final_sim:.4f}")
     logger.info(f"Improvement: +{improvement:.4f} ({improvement/initial_sim*100:+.1f}%)")
     
-    return ido_aligned, epo_aligned
+    return to_host(ido_aligned), to_host(epo_aligned)
 
 
-def compute_seed_similarity(ido_emb, ido_idx, epo_emb, epo_idx, seed_pairs):
-    """Compute mean cosine similarity for seed pairs."""
-    similarities = []
+def compute_seed_similarity(ido_emb, epo_emb, pairs_ii):
+    """
+    Compute mean cosine similarity for seed pairs.
     
-    for ido_word, epo_word in seed_pairs:
-        if ido_word in ido_idx and epo_word in epo_idx:
-            ido_vec = ido_emb[ido_idx[ido_word]]
-            epo_vec = epo_emb[epo_idx[epo_word]]
-            sim = np.dot(ido_vec, epo_vec)
-            similarities.append(sim)
+    pairs_ii holds one (ido row, epo row) index pair per seed pair.
+    """
+    if not len(pairs_ii):
+        return 0.0
+    xp = cp.get_array_module(ido_emb) if cp is not None else np
+    # Row-wise dot products without materializing the elementwise product
+    sims = xp.einsum('ij,ij->i', ido_emb[pairs_ii[:, 0]], epo_emb[pairs_ii[:, 1]])
+    return float(sims.mean())
+
+
+def top_k_rows(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column indices and values of the k largest entries of each row, best first.
     
-    return np.mean(similarities) if similarities else 0.0
+    Uses argpartition so only the k selected entries per row are sorted.
+    Works on numpy and cupy arrays alike.
+    """
+    xp = cp.get_array_module(similarities) if cp is not None else np
+    n = similarities.shape[1]
+    k = min(k, n)
+    if k < n:
+        part = xp.argpartition(similarities, n - k, axis=1)[:, n - k:]
+    else:
+        part = xp.broadcast_to(xp.arange(n), similarities.shape)
+    part_sims = xp.take_along_axis(similarities, part, axis=1)
+    order = xp.argsort(-part_sims, axis=1)
+    return xp.take_along_axis(part, order, axis=1), xp.take_along_axis(part_sims, order, axis=1)
 
 
-def find_translation_candidates(
+if njit is not None:
+    @njit(parallel=True)
+    def _topk_threshold(sims, thr, k, out_idx, out_val):
+        """
+        Per row, the k largest entries reaching thr, best first, in one pass.
+        
+        Each row keeps a small sorted buffer; an entry is inserted only if it
+        reaches thr and beats the current k-th best. Unused slots keep
+        out_idx = -1 and out_val = -inf. Ties keep the lower column first.
+        """
+        for j in prange(sims.shape[0]):
+            count = 0
+            for i in range(sims.shape[1]):
+                v = sims[j, i]
+                if v < thr or (count == k and v <= out_val[j, k - 1]):
+                    continue
+                pos = count if count < k else k - 1
+                while pos > 0 and out_val[j, pos - 1] < v:
+                    out_val[j, pos] = out_val[j, pos - 1]
+                    out_idx[j, pos] = out_idx[j, pos - 1]
+                    pos -= 1
+                out_val[j, pos] = v
+                out_idx[j, pos] = i
+                if count < k:
+                    count += 1
+
+
+def top_k_above(similarities: np.ndarray, k: int, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Like top_k_rows, but entries below threshold may be dropped.
+    
+    With numba and a numpy array, threshold and top-k are applied in a single
+    pass over the similarity block; dropped slots hold index -1 and similarity
+    -inf, so batch_translations filters them out. Otherwise this is top_k_rows.
+    """
+    if njit is None or not isinstance(similarities, np.ndarray):
+        return top_k_rows(similarities, k)
+    k = min(k, similarities.shape[1])
+    out_idx = np.full((similarities.shape[0], k), -1, dtype=np.int64)
+    out_val = np.full((similarities.shape[0], k), -np.inf, dtype=similarities.dtype)
+    if k:
+        _topk_threshold(similarities, similarities.dtype.type(threshold), k, out_idx, out_val)
+    return out_idx, out_val
+
+
+def quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+    """Quantize rows to int8 with a per-row scale mapping max |x| to 127."""
+    scale = 127.0 / (np.abs(embeddings).max(axis=1, keepdims=True) + 1e-12)
+    return np.rint(embeddings * scale).astype(np.int8)
+
+
+def check_search_options(search: str = 'numpy', device: str = 'cpu', int8_search: bool = False):
+    """
+    Raise ImportError/ValueError if the search options cannot run here.
+    
+    Called before the (slow) retrofitting, so a missing backend or an
+    unsupported combination fails immediately.
+    """
+    get_array_module(device)
+    if int8_search:
+        if simsimd is None:
+            raise ImportError("--int8-search requires simsimd (pip install simsimd)")
+        if device != 'cpu' or search not in ('numpy', 'simsimd'):
+            raise ValueError("--int8-search works with the CPU numpy/simsimd search only")
+    elif search == 'simsimd':
+        if simsimd is None:
+            raise ImportError("--search simsimd requires simsimd (pip install simsimd)")
+        if device != 'cpu':
+            raise ValueError("--search simsimd runs on the CPU only")
+    elif search in ('faiss', 'faiss-hnsw'):
+        if faiss is None:
+            raise ImportError("FAISS search requested but faiss is not installed (pip install faiss-cpu)")
+
+
+def iter_translation_candidates(
     ido_emb: np.ndarray,
     ido_vocab: List[str],
     epo_emb: np.ndarray,
     epo_vocab: List[str],
     threshold: float = 0.80,
     top_k: int = 5,
-    batch_size: int = 100
-):
-    """Find translation candidates using aligned embeddings."""
+    batch_size: int = 100,
+    search: str = 'numpy',
+    device: str = 'cpu',
+    int8_search: bool = False,
+    workers: int = 1
+) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Find translation candidates using aligned embeddings.
+    
+    Returns an iterator of (ido_word, translations), produced batch by batch,
+    so callers can write the candidates out without holding them all in
+    memory. The search options are checked here, before the first batch.
+    
+    search selects the nearest-neighbour backend: 'numpy' (exact, dense
+    similarity rows), 'faiss' (exact top-k with a flat inner-product index),
+    'faiss-hnsw' (approximate HNSW graph, sublinear in |epo_vocab|) or
+    'simsimd' (SIMD cosine kernel that normalizes on the fly, so no
+    normalized copies of the matrices are made).
+    With device='cuda' the numpy backend runs its matmul and top-k on the
+    GPU via CuPy.
+    
+    With int8_search, the normalized embeddings are quantized to int8 and a
+    shortlist of 2*top_k candidates per word is ranked with SimSIMD's int8
+    cosine kernel. The shortlist is then rescored with the float vectors, so
+    the reported similarities and the threshold stay exact.
+    
+    With workers > 1 the CPU numpy search runs its batches in a process pool.
+    """
+    check_search_options(search, device, int8_search)
+    return _iter_translation_candidates(
+        ido_emb, ido_vocab, epo_emb, epo_vocab, threshold, top_k, batch_size,
+        search, device, int8_search, workers
+    )
+
+
+def _iter_translation_candidates(
+    ido_emb: np.ndarray,
+    ido_vocab: List[str],
+    epo_emb: np.ndarray,
+    epo_vocab: List[str],
+    threshold: float,
+    top_k: int,
+    batch_size: int,
+    search: str,
+    device: str,
+    int8_search: bool,
+    workers: int
+) -> Iterator[Tuple[str, List[Dict]]]:
+    """Generator behind iter_translation_candidates(); options are already checked."""
+    xp = get_array_module(device)
     logger.info(f"\n{'='*60}")
     logger.info(f"FINDING TRANSLATION CANDIDATES")
     logger.info(f"{'='*60}")
     logger.info(f"Threshold: {threshold}")
     logger.info(f"Top-k per word: {top_k}")
+    logger.info(f"Search: {search}{' (int8 shortlist)' if int8_search else ''}")
     
-    candidates = {}
+    num_words = 0
     total_pairs = 0
+    shortlist_k = top_k
+    ido_exact = epo_exact = None
+    batches = None
+    
+    if int8_search:
+        ido_exact = ido_emb / (np.linalg.norm(ido_emb, axis=1, keepdims=True) + 1e-8)
+        epo_exact = epo_emb / (np.linalg.norm(epo_emb, axis=1, keepdims=True) + 1e-8)
+        ido_rows = quantize_int8(ido_exact)
+        epo_rows = quantize_int8(epo_exact)
+        shortlist_k = 2 * top_k
+        
+        def batch_similarities(batch):
+            distances = simsimd.cdist(batch, epo_rows, metric='cosine', threads=0)
+            return 1 - np.asarray(distances)
+    elif search == 'simsimd':
+        ido_rows = np.ascontiguousarray(ido_emb, dtype=np.float32)
+        epo_rows = np.ascontiguousarray(epo_emb, dtype=np.float32)
+        
+        def batch_similarities(batch):
+            distances = simsimd.cdist(batch, epo_rows, metric='cosine', threads=0)
+            return 1 - np.asarray(distances)
+    else:
+        # Normalize embeddings
+        ido_emb, epo_emb = xp.asarray(ido_emb), xp.asarray(epo_emb)
+        ido_norm = ido_emb / (xp.linalg.norm(ido_emb, axis=1, keepdims=True) + 1e-8)
+        epo_norm = epo_emb / (xp.linalg.norm(epo_emb, axis=1, keepdims=True) + 1e-8)
+        
+        if search != 'numpy':
+            batches = iter_candidates_faiss(
+                to_host(ido_norm), ido_vocab, to_host(epo_norm), epo_vocab,
+                threshold, top_k, batch_size, hnsw=(search == 'faiss-hnsw')
+            )
+        elif workers > 1 and xp is np:
+            batches = iter_candidates_parallel(
+                ido_norm, ido_vocab, epo_norm, epo_vocab,
+                threshold, top_k, batch_size, workers
+            )
+        
+        ido_rows = ido_norm
+        
+        def batch_similarities(batch):
+            return xp.dot(batch, epo_norm.T)
+    
+    def iter_batches():
+        for i in tqdm(range(0, len(ido_vocab), batch_size), desc="Finding candidates"):
+            batch_end = min(i + batch_size, len(ido_vocab))
+            
+            # Compute similarities
+            similarities = batch_similarities(ido_rows[i:batch_end])
+            
+            # Get top-k for each word, best first
+            if ido_exact is None:
+                top_indices, top_sims = top_k_above(similarities, top_k, threshold)
+            else:
+                top_indices, top_sims = top_k_rows(similarities, shortlist_k)
+            top_indices, top_sims = to_host(top_indices), to_host(top_sims)
+            if ido_exact is not None:
+                # Rescore the int8 shortlist with the float vectors
+                exact = np.einsum('ij,ikj->ik', ido_exact[i:batch_end], epo_exact[top_indices])
+                order = np.argsort(-exact, axis=1)[:, :top_k]
+                top_indices = np.take_along_axis(top_indices, order, axis=1)
+                top_sims = np.take_along_axis(exact, order, axis=1)
+            
+            yield from batch_translations(ido_vocab[i:batch_end], top_indices, top_sims,
+                                          epo_vocab, threshold)
+    
+    if batches is None:
+        batches = iter_batches()
+    
+    for word, translations in batches:
+        num_words += 1
+        total_pairs += len(translations)
+        yield word, translations
+    
+    logger.info(f"Found {num_words:,} Ido words with translations")
+    logger.info(f"Total translation pairs: {total_pairs:,}")
+
+
+def batch_translations(
+    batch_words: List[str],
+    top_indices: np.ndarray,
+    top_sims: np.ndarray,
+    epo_vocab: List[str],
+    threshold: float
+) -> List[Tuple[str, List[Dict]]]:
+    """(ido_word, translations) for each batch word with a top-k candidate reaching threshold."""
+    keep = top_sims >= threshold
+    results = []
+    for j, word in enumerate(batch_words):
+        row = keep[j]
+        if row.any():
+            translations = [
+                {
+                    'translation': epo_vocab[idx],
+                    'similarity': float(sim)
+                }
+                for idx, sim in zip(top_indices[j][row].tolist(), top_sims[j][row])
+            ]
+            results.append((word, translations))
+    return results
+
+
+# Per-process state for iter_candidates_parallel workers
+_search_state = {}
+
+
+def _init_search_worker(ido_path, epo_path, ido_vocab, epo_vocab, threshold, top_k, batch_size):
+    """Map the normalized embeddings shared by all workers and keep the search settings."""
+    _search_state.update(
+        ido=np.load(ido_path, mmap_mode='r'),
+        epo=np.load(epo_path, mmap_mode='r'),
+        ido_vocab=ido_vocab,
+        epo_vocab=epo_vocab,
+        threshold=threshold,
+        top_k=top_k,
+        batch_size=batch_size
+    )
+
+
+def _search_batch(start: int) -> List[Tuple[str, List[Dict]]]:
+    """Candidates for the batch of Ido words beginning at start."""
+    state = _search_state
+    end = min(start + state['batch_size'], len(state['ido_vocab']))
+    similarities = np.dot(state['ido'][start:end], state['epo'].T)
+    top_indices, top_sims = top_k_above(similarities, state['top_k'], state['threshold'])
+    return batch_translations(state['ido_vocab'][start:end], top_indices, top_sims,
+                              state['epo_vocab'], state['threshold'])
+
+
+def iter_candidates_parallel(
+    ido_norm: np.ndarray,
+    ido_vocab: List[str],
+    epo_norm: np.ndarray,
+    epo_vocab: List[str],
+    threshold: float,
+    top_k: int,
+    batch_size: int = 100,
+    workers: int = 2
+) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Numpy candidate search with batches spread over a process pool.
     
-    # Normalize embeddings
-    ido_norm = ido_emb / (np.linalg.norm(ido_emb, axis=1, keepdims=True) + 1e-8)
-    epo_norm = epo_emb / (np.linalg.norm(epo_emb, axis=1, keepdims=True) + 1e-8)
+    The normalized matrices are written to temporary .npy files and
+    memory-mapped by every worker, so the pages are shared rather than
+    pickled to each process. Results are yielded in vocabulary order.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ido_path = Path(tmp_dir) / 'ido_norm.npy'
+        epo_path = Path(tmp_dir) / 'epo_norm.npy'
+        np.save(ido_path, ido_norm)
+        np.save(epo_path, epo_norm)
+        
+        starts = range(0, len(ido_vocab), batch_size)
+        # Spawn rather than fork: forking after the Numba/BLAS thread pools
+        # have started can deadlock the workers
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_search_worker,
+            initargs=(ido_path, epo_path, ido_vocab, epo_vocab, threshold, top_k, batch_size)
+        ) as executor:
+            results = executor.map(_search_batch, starts, chunksize=8)
+            for batch in tqdm(results, total=len(starts), desc="Finding candidates"):
+                yield from batch
+
+
+def find_translation_candidates(*args, **kwargs) -> Dict[str, List[Dict]]:
+    """Collect iter_translation_candidates() into a {ido_word: translations} dict."""
+    return dict(iter_translation_candidates(*args, **kwargs))
+
+
+def write_candidates_json(candidates: Iterable[Tuple[str, List[Dict]]], output_file: Path) -> Tuple[int, int]:
+    """
+    Write (ido_word, translations) pairs as one JSON object, entry by entry.
+    
+    The file is identical to json.dump(dict(candidates), f, indent=2,
+    ensure_ascii=False) but only one entry is held in memory at a time.
+    It is written to a temporary file next to output_file and moved into
+    place only once complete, so a failed search leaves the old file intact.
+    Returns the number of Ido words and of translation pairs written.
+    """
+    num_words = total_pairs = 0
+    with replace_on_success(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write('{')
+        for word, translations in candidates:
+            # Strip the enclosing '{\n' and '\n}' of a one-entry object
+            entry = json.dumps({word: translations}, indent=2, ensure_ascii=False)[2:-2]
+            f.write(',\n' if num_words else '\n')
+            f.write(entry)
+            num_words += 1
+            total_pairs += len(translations)
+        f.write('\n}' if num_words else '}')
+    return num_words, total_pairs
+
+
+def iter_candidates_faiss(
+    ido_norm: np.ndarray,
+    ido_vocab: List[str],
+    epo_norm: np.ndarray,
+    epo_vocab: List[str],
+    threshold: float,
+    top_k: int,
+    batch_size: int = 100,
+    hnsw: bool = False
+):
+    """
+    Top-k candidate search over normalized embeddings with a FAISS index.
+    
+    Yields (ido_word, translations). FAISS returns each row's top_k
+    neighbours already sorted, so only the threshold filter is left to do.
+    """
+    if faiss is None:
+        raise ImportError("FAISS search requested but faiss is not installed (pip install faiss-cpu)")
+    
+    epo_f32 = np.ascontiguousarray(epo_norm, dtype=np.float32)
+    dim = epo_f32.shape[1]
+    if hnsw:
+        index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+        # Wider beam than the default 16 keeps recall close to exact search
+        index.hnsw.efSearch = max(128, 4 * top_k)
+    else:
+        index = faiss.IndexFlatIP(dim)
+    index.add(epo_f32)
     
-    # Process in batches
     for i in tqdm(range(0, len(ido_vocab), batch_size), desc="Finding candidates"):
         batch_end = min(i + batch_size, len(ido_vocab))
-        batch_ido = ido_norm[i:batch_end]
-        batch_words = ido_vocab[i:batch_end]
+        batch_ido = np.ascontiguousarray(ido_norm[i:batch_end], dtype=np.float32)
+        scores, indices = index.search(batch_ido, top_k)
         
-        # Compute similarities
-        similarities = np.dot(batch_ido, epo_norm.T)
-        
-        # Get top-k for each word
-        for j, word in enumerate(batch_words):
-            # Get indices above threshold
-            above_threshold = np.where(similarities[j] >= threshold)[0]
-            
-            if len(above_threshold) > 0:
-                # Get top-k
-                top_indices = above_threshold[np.argsort(similarities[j][above_threshold])][::-1][:top_k]
-                
-                translations = [
+        # Missing neighbours are reported as index -1
+        keep = (scores >= threshold) & (indices >= 0)
+        for j, word in enumerate(ido_vocab[i:batch_end]):
+            row = keep[j]
+            if row.any():
+                yield word, [
                     {
                         'translation': epo_vocab[idx],
-                        'similarity': float(similarities[j][idx])
+                        'similarity': float(sim)
                     }
-                    for idx in top_indices
+                    for idx, sim in zip(indices[j][row].tolist(), scores[j][row])
                 ]
-                
-                candidates[word] = translations
-                total_pairs += len(translations)
-    
-    logger.info(f"Found {len(candidates):,} Ido words with translations")
-    logger.info(f"Total translation pairs: {total_pairs:,}")
-    
-    return candidates
 
 
 def main():
@@ -259,23 +775,41 @@ def main():
     parser.add_argument('--ido-bert', type=Path, required=True)
     parser.add_argument('--ido-vocab', type=Path, required=True)
     parser.add_argument('--epo-w2v', type=Path, required=True,
-                        help='Esperanto embeddings (.model or .npy)')
+                        help='Esperanto embeddings (.model, .kv or .npy)')
     parser.add_argument('--epo-vocab', type=Path,
                         help='Esperanto vocabulary (required if .npy)')
+    parser.add_argument('--export-kv', action='store_true',
+                        help='When --epo-w2v is a .model, also save its vectors as a sibling .kv '
+                             '(+ .vectors.npy) that later runs load memory-mapped')
     parser.add_argument('--seed-dict', type=Path, required=True)
     parser.add_argument('--output-dir', type=Path, required=True)
     parser.add_argument('--threshold', type=float, default=0.80)
     parser.add_argument('--iterations', type=int, default=10)
     parser.add_argument('--alpha', type=float, default=0.5)
+    parser.add_argument('--search', choices=['numpy', 'faiss', 'faiss-hnsw', 'simsimd'],
+                        default='numpy',
+                        help='Candidate search backend (faiss backends need faiss-cpu, '
+                             'simsimd needs simsimd)')
+    parser.add_argument('--int8-search', action='store_true',
+                        help='Shortlist candidates on int8-quantized embeddings (needs simsimd); '
+                             'similarities are rescored exactly')
+    parser.add_argument('--device', choices=['cpu', 'cuda'], default='cpu',
+                        help='Run retrofitting and numpy candidate search on the GPU (needs cupy)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for the CPU numpy candidate search (default: 1)')
     
     args = parser.parse_args()
     
+    # Fail on a missing search backend before the slow loading and retrofitting
+    check_search_options(args.search, args.device, args.int8_search)
+    
     # Load embeddings
     ido_emb, ido_vocab, ido_idx = load_bert_embeddings(args.ido_bert, args.ido_vocab)
-    epo_emb, epo_vocab, epo_idx = load_word2vec_model(args.epo_w2v, args.epo_vocab)
+    epo_emb, epo_vocab, epo_idx = load_word2vec_model(args.epo_w2v, args.epo_vocab, args.export_kv)
     
     # Load seed dictionary
-    seed_pairs = load_seed_dictionary(args.seed_dict, set(ido_vocab), set(epo_vocab))
+    # The word-to-index dicts already answer membership; no vocab sets needed
+    seed_pairs = load_seed_dictionary(args.seed_dict, ido_idx, epo_idx)
     
     # Retrofit embeddings
     ido_aligned, epo_aligned = retrofit_embeddings(
@@ -283,28 +817,29 @@ def main():
         epo_emb, epo_vocab, epo_idx,
         seed_pairs,
         iterations=args.iterations,
-        alpha=args.alpha
+        alpha=args.alpha,
+        device=args.device
     )
     
-    # Find translation candidates
-    candidates = find_translation_candidates(
+    # Find translation candidates, streaming them straight to disk
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    candidates_file = args.output_dir / 'bert_candidates.json'
+    candidates = iter_translation_candidates(
         ido_aligned, ido_vocab,
         epo_aligned, epo_vocab,
-        threshold=args.threshold
+        threshold=args.threshold,
+        search=args.search,
+        device=args.device,
+        int8_search=args.int8_search,
+        workers=args.workers
     )
+    candidates_found, total_pairs = write_candidates_json(candidates, candidates_file)
     
     # Save results
-    args.output_dir.mkdir(parents=True, exist_ok=True)
-    
     logger.info(f"\n{'='*60}")
     logger.info(f"SAVING RESULTS")
     logger.info(f"{'='*60}")
-    
-    # Save candidates
-    candidates_file = args.output_dir / 'bert_candidates.json'
-    logger.info(f"Saving candidates to {candidates_file}")
-    with open(candidates_file, 'w', encoding='utf-8') as f:
-        json.dump(candidates, f, indent=2, ensure_ascii=False)
+    logger.info(f"Saved candidates to {candidates_file}")
     
     # Save aligned embeddings
     logger.info(f"Saving aligned embeddings...")
@@ -317,8 +852,8 @@ def main():
         'epo_vocab_size': len(epo_vocab),
         'seed_pairs': len(seed_pairs),
         'threshold': args.threshold,
-        'candidates_found': len(candidates),
-        'total_pairs': sum(len(v) for v in candidates.values())
+        'candidates_found': candidates_found,
+        'total_pairs': total_pairs
     }
     
     stats_file = args.output_dir / 'bert_alignment_stats.json'
@@ -328,7 +863,7 @@ def main():
     logger.info(f"\n{'='*60}")
     logger.info(f"✅ ALIGNMENT COMPLETE")
     logger.info(f"{'='*60}")
-    logger.info(f"Candidates found: {len(candidates):,} Ido words")
+    logger.info(f"Candidates found: {candidates_found:,} Ido words")
     logger.info(f"Total pairs: {stats['total_pairs']:,}")
     logger.info(f"Results saved to: {args.output_dir}")
 
@@ -21,7 +21,7 @@ import json
 import logging
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from gensim.models import Word2Vec
 from sklearn.decomposition import PCA
 from sklearn.metrics.pairwise import cosine_similarity
@@ -37,7 +37,8 @@ logger = logging.getLogger(__name__)
 def load_bert_embeddings(npy_path: Path, vocab_path: Path) -> Tuple[np.ndarray, List[str], Dict[str, int]]:
     """Load BERT embeddings and vocabulary."""
     logger.info(f"Loading BERT embeddings from {npy_path}")
-    embeddings = np.load(npy_path)
+    # Memory-mapped: pages are read on first touch and shared between processes
+    embeddings = np.load(npy_path, mmap_mode='r')
     
     logger.info(f"Loading vocabulary from {vocab_path}")
     with open(vocab_path, 'r', encoding='utf-8') as f:
@@ -80,14 +81,25 @@ def load_seed_dictionary(seed_path: Path) -> Dict[str, List[str]]:
     return dict(seed_dict)
 
 
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize each row of an embedding matrix."""
+    return embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+
+
 def find_nearest_words(
     embeddings: np.ndarray,
     vocab: List[str],
     query_word: str,
     word_to_idx: Dict[str, int],
-    top_k: int = 10
+    top_k: int = 10,
+    emb_norm: Optional[np.ndarray] = None
 ) -> List[Tuple[str, float]]:
-    """Find k nearest words to query word."""
+    """
+    Find k nearest words to query word.
+    
+    Pass emb_norm (normalize_rows(embeddings)) when querying the same matrix
+    repeatedly, so it is not re-normalized on every call.
+    """
     if query_word not in word_to_idx:
         return []
     
@@ -96,7 +108,8 @@ def find_nearest_words(
     
     # Normalize
     query_norm = query_vec / (np.linalg.norm(query_vec) + 1e-8)
-    emb_norm = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+    if emb_norm is None:
+        emb_norm = normalize_rows(embeddings)
     
     # Compute similarities
     similarities = np.dot(emb_norm, query_norm.T).flatten()
@@ -107,6 +120,42 @@ def find_nearest_words(
     return [(vocab[idx], float(similarities[idx])) for idx in top_indices]
 
 
+def find_nearest_words_batch(
+    emb_norm: np.ndarray,
+    vocab: List[str],
+    query_words: List[str],
+    word_to_idx: Dict[str, int],
+    top_k: int = 10
+) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Find k nearest words for many query words with a single matrix product.
+    
+    emb_norm must be row-normalized (see normalize_rows). Query words missing
+    from the vocabulary are left out of the result. Each query word itself is
+    excluded from its own neighbours.
+    """
+    queries = [w for w in query_words if w in word_to_idx]
+    if not queries:
+        return {}
+    
+    q_idx = np.array([word_to_idx[w] for w in queries])
+    similarities = emb_norm[q_idx] @ emb_norm.T
+    
+    # top_k + 1 so the query word can be dropped and k neighbours remain
+    n = similarities.shape[1]
+    k = min(top_k + 1, n)
+    top = np.argpartition(similarities, n - k, axis=1)[:, n - k:]
+    top_sims = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_sims, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    
+    neighbors = {}
+    for row, word in enumerate(queries):
+        indices = [idx for idx in top[row].tolist() if idx != q_idx[row]][:top_k]
+        neighbors[word] = [(vocab[idx], float(similarities[row, idx])) for idx in indices]
+    return neighbors
+
+
 def analyze_seed_coverage(
     bert_embeddings: np.ndarray,
     bert_vocab: List[str],
@@ -149,13 +198,17 @@ def compare_nearest_neighbors(
     
     comparisons = {}
     
+    # Normalize each matrix once and query all words in one product
+    bert_all = find_nearest_words_batch(
+        normalize_rows(bert_embeddings), bert_vocab, query_words, bert_word_to_idx, top_k
+    )
+    w2v_all = find_nearest_words_batch(
+        normalize_rows(w2v_embeddings), w2v_vocab, query_words, w2v_word_to_idx, top_k
+    )
+    
     for word in query_words:
-        bert_neighbors = find_nearest_words(
-            bert_embeddings, bert_vocab, word, bert_word_to_idx, top_k
-        )
-        w2v_neighbors = find_nearest_words(
-            w2v_embeddings, w2v_vocab, word, w2v_word_to_idx, top_k
-        )
+        bert_neighbors = bert_all.get(word)
+        w2v_neighbors = w2v_all.get(word)
         
         if bert_neighbors and w2v_neighbors:
             comparisons[word] = {
@@ -177,8 +230,15 @@ def project_to_300d(embeddings: np.ndarray) -> np.ndarray:
     """Project BERT embeddings from 768d to 300d using PCA."""
     logger.info("Projecting BERT embeddings from 768d to 300d using PCA...")
     
-    pca = PCA(n_components=300, random_state=42)
-    projected = pca.fit_transform(embeddings)
+    try:
+        # Eigendecomposition of the 768x768 covariance matrix instead of an
+        # SVD of the whole |V|x768 matrix (scikit-learn >= 1.5)
+        pca = PCA(n_components=300, svd_solver='covariance_eigh', random_state=42)
+        projected = pca.fit_transform(embeddings)
+    except ValueError:
+        # Older scikit-learn: randomized SVD, O(|V|·768·300) rather than full SVD
+        pca = PCA(n_components=300, svd_solver='randomized', random_state=42)
+        projected = pca.fit_transform(embeddings)
     
     explained_var = np.sum(pca.explained_variance_ratio_)
     logger.info(f"PCA explained variance: {explained_var:.2%}")
@@ -15,9 +15,15 @@ import argparse
 from pathlib import Path
 from typing import Dict, Any, List
 
-import xml.etree.ElementTree as ET
 import yaml
 
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -83,34 +89,26 @@ def infer_pos_from_par(par_name: str) -> str:
 
 
 def extract_entries(monodix_path: Path) -> List[Dict[str, Any]]:
-    tree = ET.parse(monodix_path)
-    root = tree.getroot()
+    """
+    Collect lemma/surface/paradigm for the <e> entries of <section id='main'>.
 
-    section = root.find(".//section[@id='main']")
-    if section is None:
-        raise RuntimeError("Could not find <section id='main'> in monodix")
+    The monodix is streamed with iterparse: each entry is read when its end
+    tag arrives and cleared right after, so memory stays flat regardless of
+    the dictionary size. lxml is used when installed.
+    """
+    if HAVE_LXML:
+        elements = _iter_main_entries_lxml(monodix_path)
+    else:
+        elements = _iter_main_entries(monodix_path)
 
     entries: Dict[str, Dict[str, Any]] = {}
 
-    for e in section.findall("e"):
-        lm = e.get("lm")
-        if not lm:
-            continue
-
-        i_el = e.find("i")
-        par_el = e.find("par")
-        if i_el is None or par_el is None:
-            continue
-
-        surface = (i_el.text or "").strip()
-        par_name = par_el.get("n") or ""
-        if not surface or not par_name:
-            continue
-
-        # Skip numeric regex entry; it's special
-        if par_name == "num_regex":
+    for e in elements:
+        entry = _read_entry(e)
+        if entry is None:
             continue
 
+        lm, surface, par_name = entry
         pos = infer_pos_from_par(par_name)
 
         # Deduplicate by lemma; first occurrence wins
@@ -125,6 +123,104 @@ def extract_entries(monodix_path: Path) -> List[Dict[str, Any]]:
     return list(entries.values())
 
 
+def _iter_main_entries(monodix_path: Path):
+    """
+    Yield the <e> children of the first <section id='main'> (stdlib iterparse).
+
+    Each entry is dropped once the caller has read it, and parsing stops at
+    the end of the main section.
+    """
+    found_section = False
+    section = None
+    depth = 0
+    section_depth = 0
+
+    for event, elem in ET.iterparse(monodix_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if elem.tag == "section" and not found_section and elem.get("id") == "main":
+                found_section = True
+                section = elem
+                section_depth = depth
+            continue
+
+        depth -= 1
+        if elem is section:
+            break
+        if elem.tag == "pardef" or depth == 1:
+            # Paradigms and other top-level blocks are not needed
+            elem.clear()
+            continue
+        if section is None or elem.tag != "e" or depth != section_depth:
+            continue
+
+        # Entry complete: hand it out, then drop it (and any earlier siblings)
+        yield elem
+        section.clear()
+
+    if not found_section:
+        raise RuntimeError("Could not find <section id='main'> in monodix")
+
+
+def _iter_main_entries_lxml(monodix_path: Path):
+    """
+    Yield the <e> children of the first <section id='main'> (lxml iterparse).
+
+    libxml2 only reports </e> events, and the parent link replaces the depth
+    bookkeeping of the stdlib version. Parsing stops at the first entry past
+    the main section.
+    """
+    section = None
+
+    for _, elem in ET.iterparse(str(monodix_path), events=("end",), tag="e"):
+        parent = elem.getparent()
+        if parent.tag == "section":
+            if section is None and parent.get("id") == "main":
+                section = parent
+            elif section is not None and parent is not section:
+                break
+            if parent is section:
+                yield elem
+
+        # Drop the entry and the finished siblings before it
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
+
+    if section is None:
+        raise RuntimeError("Could not find <section id='main'> in monodix")
+
+
+def _read_entry(e: ET.Element):
+    """(lemma, surface, paradigm) of a monodix <e>, or None if it should be skipped."""
+    lm = e.get("lm")
+    if not lm:
+        return None
+
+    # First <i> and <par> child in one pass over the children
+    i_el = par_el = None
+    for child in e:
+        if child.tag == "i":
+            if i_el is None:
+                i_el = child
+        elif child.tag == "par":
+            if par_el is None:
+                par_el = child
+    if i_el is None or par_el is None:
+        return None
+
+    surface = (i_el.text or "").strip()
+    par_name = par_el.get("n") or ""
+    if not surface or not par_name:
+        return None
+
+    # Skip numeric regex entry; it's special
+    if par_name == "num_regex":
+        return None
+
+    return lm, surface, par_name
+
+
 def build_yaml(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
     paradigm_map = build_paradigm_map()
 
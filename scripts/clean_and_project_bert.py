@@ -19,60 +19,131 @@ import argparse
 import logging
 import numpy as np
 import re
+from itertools import compress
 from pathlib import Path
 from typing import List, Tuple, Set
-from sklearn.decomposition import PCA
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.decomposition import PCA, IncrementalPCA
 from tqdm import tqdm
 
+from _embeddings import average_groups, group_case_variants
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# --dtype choices for the saved embeddings
+SAVE_DTYPES = {'fp32': np.float32, 'fp16': np.float16}
 
-def is_clean_word(word: str) -> bool:
+# Compiled once; the filters run on every word of the vocabulary.
+# Any punctuation, digit or special character rejects a word.
+_REJECT_RE = re.compile(r'[.,;:!?"\'()\[\]{}<>«»`*@#$%^&+=|\\/_~\d]')
+_LETTER_RE = re.compile(r'[a-zA-Zĉĝĥĵŝŭ]')
+# Narrower set used only to report why a word was removed
+_BRACKET_PUNCT = frozenset('.,;:!?"\'()[]{}<>')
+
+# classify_word results
+WORD_CLEAN, WORD_PUNCT, WORD_DIGIT, WORD_SPECIAL = range(4)
+
+
+def read_vocab(path: Path) -> List[str]:
     """
-    Check if word is clean (no punctuation, no special chars).
+    Read one word per line, stripped.
     
-    Returns True for: hundo, manjar, bela, urbo, etc.
-    Returns False for: hundo, "hundo, 123, a., etc.
+    The file is decoded in one go and split on '\n' only (not splitlines(),
+    which also breaks on characters like U+2028 and would shift words
+    against the embedding rows).
     """
-    # Skip if empty
-    if not word or len(word) == 0:
-        return False
-    
-    # Skip single characters (except 'o', 'a', 'e', 'i', 'u')
-    if len(word) == 1 and word not in ['o', 'a', 'e', 'i', 'u']:
-        return False
+    lines = path.read_text(encoding='utf-8').split('\n')
+    if lines[-1] == '':
+        # Text after the final newline
+        lines.pop()
+    return [line.strip() for line in lines]
+
+
+def classify_word(word: str) -> int:
+    """
+    WORD_CLEAN for a clean word, else the reason it is removed.
     
-    # Skip if contains any punctuation
-    if re.search(r'[.,;:!?"\'()\[\]{}<>«»""''`]', word):
-        return False
+    Removed words are reported as WORD_PUNCT if they contain punctuation,
+    else WORD_DIGIT if they contain a digit, else WORD_SPECIAL. The
+    offending characters come from the same regex scan that rejects the
+    word, so a removed word is scanned only once.
+    """
+    # Purely alphabetic words (the common case) cannot contain punctuation,
+    # digits or special characters, so skip the scan
+    bad = _REJECT_RE.findall(word) if not word.isalpha() else None
+    if bad:
+        if any(c in _BRACKET_PUNCT for c in bad):
+            return WORD_PUNCT
+        if any(c.isdecimal() for c in bad):
+            return WORD_DIGIT
+        return WORD_SPECIAL
     
-    # Skip if contains digits
-    if re.search(r'\d', word):
-        return False
+    # Skip if empty
+    if not word:
+        return WORD_SPECIAL
     
-    # Skip if contains special characters
-    if re.search(r'[*@#$%^&+=|\\/_~]', word):
-        return False
+    # Skip single characters (except 'o', 'a', 'e', 'i', 'u')
+    if len(word) == 1 and word not in ('o', 'a', 'e', 'i', 'u'):
+        return WORD_SPECIAL
     
     # Skip if all uppercase (likely acronym or special token)
     if word.isupper() and len(word) > 1:
-        return False
+        return WORD_SPECIAL
     
     # Must contain at least one letter
-    if not re.search(r'[a-zA-Zĉĝĥĵŝŭ]', word):
-        return False
+    if not _LETTER_RE.search(word):
+        return WORD_SPECIAL
     
-    return True
+    return WORD_CLEAN
+
+
+def is_clean_word(word: str) -> bool:
+    """
+    Check if word is clean (no punctuation, no special chars).
+    
+    Returns True for: hundo, manjar, bela, urbo, etc.
+    Returns False for: hundo, "hundo, 123, a., etc.
+    """
+    return classify_word(word) == WORD_CLEAN
+
+
+def _classify_words(words: List[str]) -> np.ndarray:
+    """classify_word for each word, as an int8 array."""
+    return np.fromiter(map(classify_word, words), dtype=np.int8, count=len(words))
+
+
+def classify_vocab(vocab: List[str], workers: int = 1, chunk_size: int = 50000) -> np.ndarray:
+    """
+    classify_word for every word of vocab, as an int8 array.
+    
+    The vocabulary is classified in chunks of chunk_size words, and the
+    progress bar advances once per chunk rather than once per word. With
+    workers > 1 the chunks go to a process pool (stdlib re holds the GIL).
+    """
+    chunks = [vocab[i:i + chunk_size] for i in range(0, len(vocab), chunk_size)]
+    tags = []
+    with tqdm(total=len(vocab), desc="Filtering", unit='word') as pbar:
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunk_tags in executor.map(_classify_words, chunks):
+                    tags.append(chunk_tags)
+                    pbar.update(len(chunk_tags))
+        else:
+            for chunk_tags in map(_classify_words, chunks):
+                tags.append(chunk_tags)
+                pbar.update(len(chunk_tags))
+    return np.concatenate(tags) if tags else np.zeros(0, dtype=np.int8)
 
 
 def clean_embeddings(
     embeddings: np.ndarray,
     vocab: List[str],
-    remove_duplicates: bool = True
+    remove_duplicates: bool = True,
+    workers: int = 1
 ) -> Tuple[np.ndarray, List[str], dict]:
     """
     Remove punctuation variants and duplicates from embeddings.
@@ -80,28 +151,20 @@ def clean_embeddings(
     If remove_duplicates=True and we have both 'hundo' and 'hundo,':
     - Keep only 'hundo'
     - Average their embeddings
+    
+    workers > 1 filters the words in parallel (see classify_vocab).
     """
     logger.info(f"Cleaning {len(vocab):,} words...")
     
-    clean_indices = []
-    clean_words = []
-    skipped_punctuation = 0
-    skipped_numbers = 0
-    skipped_special = 0
-    
-    # First pass: identify clean words
-    for i, word in enumerate(tqdm(vocab, desc="Filtering")):
-        if is_clean_word(word):
-            clean_indices.append(i)
-            clean_words.append(word)
-        else:
-            # Categorize what was skipped
-            if re.search(r'[.,;:!?"\'()\[\]{}<>]', word):
-                skipped_punctuation += 1
-            elif re.search(r'\d', word):
-                skipped_numbers += 1
-            else:
-                skipped_special += 1
+    # First pass: identify clean words, and why the others are skipped
+    tags = classify_vocab(vocab, workers)
+    keep = tags == WORD_CLEAN
+    clean_words = list(compress(vocab, keep))
+    
+    counts = np.bincount(tags, minlength=4)
+    skipped_punctuation = int(counts[WORD_PUNCT])
+    skipped_numbers = int(counts[WORD_DIGIT])
+    skipped_special = int(counts[WORD_SPECIAL])
     
     logger.info(f"Kept {len(clean_words):,} clean words")
     logger.info(f"Removed {skipped_punctuation:,} with punctuation")
@@ -109,39 +172,17 @@ def clean_embeddings(
     logger.info(f"Removed {skipped_special:,} special tokens")
     
     # Extract clean embeddings
-    clean_embeddings = embeddings[clean_indices]
+    clean_embeddings = embeddings[keep]
     
     # Handle duplicates (lowercase variants)
     if remove_duplicates:
         logger.info("Handling case variants...")
-        word_to_indices = {}
-        
-        for i, word in enumerate(clean_words):
-            word_lower = word.lower()
-            if word_lower not in word_to_indices:
-                word_to_indices[word_lower] = []
-            word_to_indices[word_lower].append(i)
-        
-        # Average duplicate embeddings
-        final_words = []
-        final_embeddings = []
-        duplicates_merged = 0
-        
-        for word_lower, indices in tqdm(word_to_indices.items(), desc="Merging"):
-            if len(indices) > 1:
-                # Average embeddings
-                avg_embedding = np.mean(clean_embeddings[indices], axis=0)
-                final_embeddings.append(avg_embedding)
-                duplicates_merged += len(indices) - 1
-            else:
-                final_embeddings.append(clean_embeddings[indices[0]])
-            
-            # Use the most common case variant (usually lowercase)
-            final_words.append(word_lower)
+        # Use the most common case variant (usually lowercase)
+        groups, final_words = group_case_variants(clean_words)
+        final_embeddings = average_groups(clean_embeddings, groups)
+        duplicates_merged = len(clean_words) - len(final_words)
         
         logger.info(f"Merged {duplicates_merged:,} duplicate variants")
-        
-        final_embeddings = np.array(final_embeddings)
     else:
         final_words = clean_words
         final_embeddings = clean_embeddings
@@ -166,17 +207,85 @@ def clean_embeddings(
     return final_embeddings, final_words, stats
 
 
-def project_to_300d(embeddings: np.ndarray, n_components: int = 300) -> Tuple[np.ndarray, dict]:
+def full_pca(embeddings: np.ndarray, n_components: int):
+    """Fit PCA on the whole matrix at once; returns the model and the projection."""
+    try:
+        # Eigendecomposition of the DxD covariance matrix instead of an SVD
+        # of the whole |V|xD matrix (scikit-learn >= 1.5)
+        pca = PCA(n_components=n_components, svd_solver='covariance_eigh', random_state=42)
+        projected = pca.fit_transform(embeddings)
+    except ValueError:
+        # Older scikit-learn: randomized SVD, O(|V|·D·k) rather than full SVD
+        pca = PCA(n_components=n_components, svd_solver='randomized', random_state=42)
+        projected = pca.fit_transform(embeddings)
+    return pca, projected
+
+
+def incremental_pca(embeddings: np.ndarray, n_components: int, batch_size: int):
+    """
+    Fit IncrementalPCA chunk by chunk and transform into a preallocated array.
+    
+    Only one chunk of batch_size rows (plus the D x D model state) is worked
+    on at a time, so no centered copy of the whole matrix is ever made.
+    """
+    n_batches = max(1, len(embeddings) // batch_size)
+    # Equal-sized chunks of at least batch_size rows each (partial_fit needs
+    # at least n_components rows per chunk)
+    bounds = np.linspace(0, len(embeddings), n_batches + 1).astype(np.int64)
+    chunks = list(zip(bounds[:-1], bounds[1:]))
+    
+    pca = IncrementalPCA(n_components=n_components)
+    for start, end in tqdm(chunks, desc="Fitting PCA"):
+        pca.partial_fit(embeddings[start:end])
+    
+    projected = np.empty((len(embeddings), n_components), dtype=embeddings.dtype)
+    for start, end in tqdm(chunks, desc="Projecting"):
+        projected[start:end] = pca.transform(embeddings[start:end])
+    return pca, projected
+
+
+def project_to_300d(
+    embeddings: np.ndarray,
+    n_components: int = 300,
+    batch_size: int = 0
+) -> Tuple[np.ndarray, dict]:
     """
     Project embeddings from 768d to 300d using PCA.
+    
+    With batch_size > 0, IncrementalPCA is fitted in chunks of that many
+    rows instead (see incremental_pca), which bounds the extra memory.
+    PCA runs in float32; when n_components is not below the input
+    dimensionality it is skipped and the embeddings are returned as they are.
     """
     logger.info(f"\n{'='*60}")
     logger.info(f"DIMENSIONALITY REDUCTION")
     logger.info(f"{'='*60}")
+    
+    # float32 halves the memory traffic of the covariance GEMM and the projection
+    embeddings = embeddings.astype(np.float32, copy=False)
+    
+    if n_components >= embeddings.shape[1]:
+        logger.info(f"Embeddings are already {embeddings.shape[1]}d; skipping PCA")
+        stats = {
+            'original_dims': embeddings.shape[1],
+            'projected_dims': embeddings.shape[1],
+            'explained_variance': 1.0,
+            'variance_per_component': [],
+            'pca_applied': False,
+            'dtype': str(embeddings.dtype)
+        }
+        return embeddings, stats
+    
     logger.info(f"Projecting from {embeddings.shape[1]}d to {n_components}d using PCA...")
     
-    pca = PCA(n_components=n_components, random_state=42)
-    projected = pca.fit_transform(embeddings)
+    if batch_size > 0:
+        if batch_size < n_components:
+            raise ValueError(f"PCA batch size ({batch_size}) must be at least "
+                             f"the number of dimensions ({n_components})")
+        logger.info(f"Incremental PCA in batches of {batch_size:,} rows")
+        pca, projected = incremental_pca(embeddings, n_components, batch_size)
+    else:
+        pca, projected = full_pca(embeddings, n_components)
     
     explained_var = np.sum(pca.explained_variance_ratio_)
     
@@ -188,7 +297,9 @@ def project_to_300d(embeddings: np.ndarray, n_components: int = 300) -> Tuple[np
         'original_dims': embeddings.shape[1],
         'projected_dims': n_components,
         'explained_variance': float(explained_var),
-        'variance_per_component': pca.explained_variance_ratio_[:10].tolist()
+        'variance_per_component': pca.explained_variance_ratio_[:10].tolist(),
+        'pca_applied': True,
+        'dtype': str(projected.dtype)
     }
     
     return projected, stats
@@ -202,16 +313,24 @@ def main():
     parser.add_argument('--output-vocab', type=Path, required=True, help="Output clean vocabulary")
     parser.add_argument('--no-merge-duplicates', action='store_true', help="Don't merge case variants")
     parser.add_argument('--dims', type=int, default=300, help="Target dimensions (default: 300)")
+    parser.add_argument('--pca-batch-size', type=int, default=0,
+                        help="Fit IncrementalPCA in batches of this many rows to bound memory "
+                             "(default: 0, fit PCA on the whole matrix)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for word filtering (default: 1)")
+    parser.add_argument('--dtype', choices=sorted(SAVE_DTYPES), default='fp32',
+                        help="Float type of the saved embeddings; fp16 halves the file "
+                             "(default: fp32)")
     
     args = parser.parse_args()
     
     # Load embeddings
     logger.info(f"Loading embeddings from {args.input}")
-    embeddings = np.load(args.input)
+    # Memory-mapped: only the rows kept by the cleaning step are read into memory
+    embeddings = np.load(args.input, mmap_mode='r')
     
     logger.info(f"Loading vocabulary from {args.vocab}")
-    with open(args.vocab, 'r', encoding='utf-8') as f:
-        vocab = [line.strip() for line in f]
+    vocab = read_vocab(args.vocab)
     
     logger.info(f"Loaded {len(vocab):,} embeddings, shape: {embeddings.shape}")
     
@@ -219,11 +338,13 @@ def main():
     clean_emb, clean_vocab, clean_stats = clean_embeddings(
         embeddings,
         vocab,
-        remove_duplicates=not args.no_merge_duplicates
+        remove_duplicates=not args.no_merge_duplicates,
+        workers=args.workers
     )
     
     # Project to 300d
-    projected_emb, proj_stats = project_to_300d(clean_emb, n_components=args.dims)
+    projected_emb, proj_stats = project_to_300d(clean_emb, n_components=args.dims,
+                                            batch_size=args.pca_batch_size)
     
     # Save results
     logger.info(f"\n{'='*60}")
@@ -233,13 +354,17 @@ def main():
     # Save embeddings
     args.output_300d.parent.mkdir(parents=True, exist_ok=True)
     logger.info(f"Saving 300d embeddings to {args.output_300d}")
-    np.save(args.output_300d, projected_emb)
+    # C-contiguous with a plain dtype, so the matrix goes out in a single write
+    np.save(args.output_300d,
+            np.ascontiguousarray(projected_emb, dtype=SAVE_DTYPES[args.dtype]),
+            allow_pickle=False)
     
     # Save vocabulary
     logger.info(f"Saving clean vocabulary to {args.output_vocab}")
     with open(args.output_vocab, 'w', encoding='utf-8') as f:
-        for word in clean_vocab:
-            f.write(word + '\n')
+        # One joined string and a single write instead of a write per word
+        if clean_vocab:
+            f.write('\n'.join(clean_vocab) + '\n')
     
     # Save stats
     stats_file = args.output_300d.parent / 'bert_cleaning_stats.json'
@@ -248,6 +373,7 @@ def main():
     stats = {
         'cleaning': clean_stats,
         'projection': proj_stats,
+        'dtype': args.dtype,
         'input_file': str(args.input),
         'output_file': str(args.output_300d),
         'vocab_file': str(args.output_vocab)
@@ -17,9 +17,15 @@ from pathlib import Path
 from typing import List, Tuple, Dict
 import re
 from gensim.models import Word2Vec
-from collections import defaultdict
+from _embeddings import average_groups, group_case_variants
+from itertools import compress
+from concurrent.futures import ProcessPoolExecutor
 import json
 
+# Compiled once; should_keep_word runs on every word of the vocabulary
+_NONWORD_RE = re.compile(r'[^\w\-ĉĝĥĵŝŭ]', re.IGNORECASE)
+_LETTER_RE = re.compile(r'[a-zĉĝĥĵŝŭ]', re.IGNORECASE)
+
 
 def should_keep_word(word: str) -> bool:
     """
@@ -30,37 +36,59 @@ def should_keep_word(word: str) -> bool:
     - No punctuation, numbers, or special characters
     - Not a special token
     """
-    # Skip special tokens
-    if word.startswith('[') and word.endswith(']'):
-        return False
-    
-    # Skip if contains numbers
-    if any(c.isdigit() for c in word):
-        return False
-    
-    # Skip if contains punctuation (except hyphens within word)
-    # Allow internal hyphens like "sankta-luizo" but not trailing "sankta-luizo,"
-    if re.search(r'[^\w\-ĉĝĥĵŝŭ]', word, re.IGNORECASE):
-        return False
-    
-    # Skip if starts or ends with hyphen
-    if word.startswith('-') or word.endswith('-'):
-        return False
-    
     # Skip very short words (1 character) except valid Esperanto words
     if len(word) < 2:
         return False
     
+    # Purely alphabetic words (the common case) pass the character checks
+    if not word.isalpha():
+        # Skip special tokens
+        if word.startswith('[') and word.endswith(']'):
+            return False
+        
+        # Skip if contains numbers
+        if any(c.isdigit() for c in word):
+            return False
+        
+        # Skip if contains punctuation (except hyphens within word)
+        # Allow internal hyphens like "sankta-luizo" but not trailing "sankta-luizo,"
+        if _NONWORD_RE.search(word):
+            return False
+        
+        # Skip if starts or ends with hyphen
+        if word.startswith('-') or word.endswith('-'):
+            return False
+    
     # Must contain at least one letter
-    if not re.search(r'[a-zĉĝĥĵŝŭ]', word, re.IGNORECASE):
+    if not _LETTER_RE.search(word):
         return False
     
     return True
 
 
+def _keep_mask(words: List[str]) -> np.ndarray:
+    """should_keep_word for each word, as a boolean array."""
+    return np.fromiter(map(should_keep_word, words), dtype=bool, count=len(words))
+
+
+def keep_word_mask(vocab: List[str], workers: int = 1, chunk_size: int = 50000) -> np.ndarray:
+    """
+    Boolean mask of the words passing should_keep_word.
+    
+    With workers > 1 the vocabulary is split into chunks of chunk_size
+    words that are filtered by a process pool (stdlib re holds the GIL).
+    """
+    if workers > 1 and len(vocab) > chunk_size:
+        chunks = [vocab[i:i + chunk_size] for i in range(0, len(vocab), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return np.concatenate(list(executor.map(_keep_mask, chunks)))
+    return _keep_mask(vocab)
+
+
 def clean_embeddings(
     model: Word2Vec,
-    merge_case: bool = True
+    merge_case: bool = True,
+    workers: int = 1
 ) -> Tuple[np.ndarray, List[str], Dict[str, int]]:
     """
     Clean Word2Vec embeddings by removing noise and merging variants.
@@ -68,6 +96,7 @@ def clean_embeddings(
     Args:
         model: Gensim Word2Vec model
         merge_case: If True, merge uppercase variants to lowercase
+        workers: Worker processes for word filtering
         
     Returns:
         Tuple of (embeddings, vocabulary, word_to_idx)
@@ -84,16 +113,10 @@ def clean_embeddings(
     
     # Step 1: Filter words
     print("\n[1/3] Filtering words...")
-    keep_indices = []
-    keep_words = []
-    
-    for idx, word in enumerate(vocab):
-        if should_keep_word(word):
-            keep_indices.append(idx)
-            keep_words.append(word)
+    keep = keep_word_mask(vocab, workers)
     
-    filtered_embeddings = embeddings[keep_indices]
-    filtered_words = keep_words
+    filtered_embeddings = embeddings[keep]
+    filtered_words = list(compress(vocab, keep))
     
     print(f"  Kept: {len(filtered_words):,} words")
     print(f"  Removed: {len(vocab) - len(filtered_words):,} words")
@@ -101,30 +124,9 @@ def clean_embeddings(
     # Step 2: Merge case variants
     if merge_case:
         print("\n[2/3] Merging case variants...")
-        word_map = defaultdict(list)  # lowercase -> [(original, idx)]
-        
-        for idx, word in enumerate(filtered_words):
-            word_lower = word.lower()
-            word_map[word_lower].append((word, idx))
-        
         # Keep lowercase version, average embeddings if multiple variants
-        clean_words = []
-        clean_embeddings_list = []
-        
-        for word_lower, variants in word_map.items():
-            if len(variants) == 1:
-                # Only one variant, keep as-is (but use lowercase)
-                _, idx = variants[0]
-                clean_words.append(word_lower)
-                clean_embeddings_list.append(filtered_embeddings[idx])
-            else:
-                # Multiple variants, average their embeddings
-                indices = [idx for _, idx in variants]
-                avg_embedding = filtered_embeddings[indices].mean(axis=0)
-                clean_words.append(word_lower)
-                clean_embeddings_list.append(avg_embedding)
-        
-        clean_embeddings = np.array(clean_embeddings_list)
+        groups, clean_words = group_case_variants(filtered_words)
+        clean_embeddings = average_groups(filtered_embeddings, groups)
         
         print(f"  Before merging: {len(filtered_words):,} words")
         print(f"  After merging: {len(clean_words):,} words")
@@ -162,15 +164,18 @@ def save_results(
     # Save embeddings
     embeddings_path = output_prefix.parent / f"{output_prefix.stem}_300d.npy"
     print(f"\nSaving embeddings to: {embeddings_path}")
-    np.save(embeddings_path, embeddings)
+    # C-contiguous float32, so the matrix goes out in a single write
+    np.save(embeddings_path, np.ascontiguousarray(embeddings, dtype=np.float32),
+            allow_pickle=False)
     print(f"  Size: {embeddings_path.stat().st_size / 1024 / 1024:.1f} MB")
     
     # Save vocabulary
     vocab_path = output_prefix.parent / f"{output_prefix.stem}_vocab.txt"
     print(f"\nSaving vocabulary to: {vocab_path}")
     with open(vocab_path, 'w', encoding='utf-8') as f:
-        for word in vocab:
-            f.write(f"{word}\n")
+        # One joined string and a single write instead of a write per word
+        if vocab:
+            f.write('\n'.join(vocab) + '\n')
     print(f"  Words: {len(vocab):,}")
     
     # Save statistics
@@ -210,6 +215,8 @@ def main():
                         help='Output prefix (e.g., models/esperanto_clean_)')
     parser.add_argument('--no-merge-case', action='store_true',
                         help='Do not merge case variants')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for word filtering (default: 1)')
     
     args = parser.parse_args()
     
@@ -228,7 +235,8 @@ def main():
     # Clean embeddings
     embeddings, vocab, word_to_idx = clean_embeddings(
         model,
-        merge_case=not args.no_merge_case
+        merge_case=not args.no_merge_case,
+        workers=args.workers
     )
     
     # Create output directory
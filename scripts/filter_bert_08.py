@@ -3,55 +3,66 @@
 Filter BERT translation candidates to only keep entries with similarity >= 0.8.
 """
 
-import json
 import argparse
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 
-def filter_candidates(input_file: Path, output_file: Path, min_similarity: float = 0.80):
-    """Filter candidates to only keep those with similarity >= min_similarity."""
-    print(f"Loading candidates from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+from _pipeline import dump_json, iter_bert_candidates, replace_on_success
+
+
+def filter_candidates(input_file: Path, output_file: Path, min_similarity: float = 0.80) -> Dict[str, int]:
+    """
+    Filter candidates to only keep those with similarity >= min_similarity.
     
-    print(f"Loaded {len(data)} Ido words with candidates")
+    Input words are streamed and each kept word is written out as soon as
+    it is filtered, so neither the input nor the filtered dict is held in
+    memory. The output goes to a temporary file that replaces output_file
+    once the input has been read completely, so output_file may be the
+    input file. Returns the word and candidate counts before and after.
+    """
+    print(f"Streaming candidates from {input_file}...")
     
-    # Count before
-    total_before = sum(len(candidates) for candidates in data.values())
-    below_threshold = sum(
-        sum(1 for c in candidates if c.get('similarity', 0) < min_similarity)
-        for candidates in data.values()
-    )
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    words_before = words_after = 0
+    total_before = total_after = 0
     
-    # Filter
-    filtered = {}
-    for ido_word, candidates in data.items():
-        high_quality = [
-            c for c in candidates
-            if c.get('similarity', 0) >= min_similarity
-        ]
-        if high_quality:
-            filtered[ido_word] = high_quality
+    # Counting and filtering in a single pass over the input
+    with replace_on_success(output_file) as f:
+        f.write(b'{')
+        for ido_word, candidates in iter_bert_candidates(input_file):
+            words_before += 1
+            total_before += len(candidates)
+            high_quality = [
+                c for c in candidates
+                if c.get('similarity', 0) >= min_similarity
+            ]
+            if high_quality:
+                f.write(b',\n  ' if words_after else b'\n  ')
+                f.write(dump_json(ido_word) + b': ')
+                f.write(dump_json(high_quality, indent_level=2))
+                words_after += 1
+                total_after += len(high_quality)
+        f.write(b'\n}' if words_after else b'}')
     
-    # Count after
-    total_after = sum(len(candidates) for candidates in filtered.values())
+    # Every dropped candidate is one below the threshold
+    below_threshold = total_before - total_after
     
     print(f"\nFiltering results:")
-    print(f"  Words before: {len(data)}")
-    print(f"  Words after:  {len(filtered)}")
+    print(f"  Words before: {words_before}")
+    print(f"  Words after:  {words_after}")
     print(f"  Candidates before: {total_before}")
     print(f"  Candidates after:  {total_after}")
     print(f"  Removed: {total_before - total_after} candidates ({below_threshold} below {min_similarity})")
     print(f"  Reduction: {100*(total_before-total_after)/total_before:.1f}%")
     
-    # Save filtered results
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(filtered, f, indent=2, ensure_ascii=False)
-    
     print(f"\n✅ Saved filtered candidates to {output_file}")
     
-    return filtered
+    return {
+        'words_before': words_before,
+        'words_after': words_after,
+        'candidates_before': total_before,
+        'candidates_after': total_after,
+    }
 
 def main():
     parser = argparse.ArgumentParser(description='Filter BERT candidates by similarity threshold')
@@ -7,24 +7,24 @@ Similarity scores are stored in XML comments like: <!-- similarity: 0.xxxx -->
 import re
 import argparse
 from pathlib import Path
-from xml.etree import ElementTree as ET
-from xml.dom import minidom
+
+from _dix import ET, parse_dix, write_dix_document
+
+_SIM_RE = re.compile(r'similarity:\s*([0-9.]+)')
 
 def extract_similarity(entry: ET.Element) -> float:
     """Extract similarity score from entry comment."""
-    # Get all text content including comments
-    text = ET.tostring(entry, encoding='unicode')
-    
-    # Look for similarity comment
-    match = re.search(r'similarity:\s*([0-9.]+)', text)
-    if match:
-        return float(match.group(1))
+    # Scan the comment nodes directly rather than serializing the entry
+    for comment in entry.iter(ET.Comment):
+        match = _SIM_RE.search(comment.text or '')
+        if match:
+            return float(match.group(1))
     return None
 
 def filter_dix_file(input_file: Path, output_file: Path, min_similarity: float = 0.80):
     """Filter .dix file to remove entries with similarity < min_similarity."""
     print(f"Loading dictionary from {input_file}...")
-    tree = ET.parse(input_file)
+    tree = parse_dix(input_file)
     root = tree.getroot()
     
     # Find main section
@@ -67,21 +67,7 @@ def filter_dix_file(input_file: Path, output_file: Path, min_similarity: float =
     # Save filtered dictionary
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    # Pretty print
-    xml_string = ET.tostring(root, encoding='unicode')
-    reparsed = minidom.parseString(xml_string)
-    pretty_xml = reparsed.toprettyxml(indent="  ")
-    
-    # Remove extra newlines
-    lines = [line for line in pretty_xml.split('\n') if line.strip()]
-    xml_string = '\n'.join(lines)
-    
-    # Ensure XML declaration
-    if not xml_string.startswith('<?xml'):
-        xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_string
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(xml_string)
+    write_dix_document(root, output_file)
     
     print(f"\n✅ Saved filtered dictionary to {output_file}")
 
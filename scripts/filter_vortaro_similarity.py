@@ -6,16 +6,17 @@ This script removes entries that only have "bert_alignment" as source
 if we can't verify their similarity >= 0.8.
 """
 
-import json
 import argparse
 from pathlib import Path
 from typing import Dict, Any
 
+from _pipeline import load_json, save_json
+
+
 def filter_vortaro(input_file: Path, output_file: Path, bert_candidates_file: Path = None, min_similarity: float = 0.80):
     """Filter vortaro dictionary to remove low-quality BERT entries."""
     print(f"Loading vortaro dictionary from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(input_file)
     
     metadata = data.get('metadata', {})
     total_words = len([k for k in data.keys() if k != 'metadata'])
@@ -25,21 +26,27 @@ def filter_vortaro(input_file: Path, output_file: Path, bert_candidates_file: Pa
     bert_similarities = {}
     if bert_candidates_file and bert_candidates_file.exists():
         print(f"Loading BERT candidates from {bert_candidates_file}...")
-        with open(bert_candidates_file, 'r', encoding='utf-8') as f:
-            bert_data = json.load(f)
+        bert_data = load_json(bert_candidates_file)
         
-        # Build similarity map: (ido_word, epo_word) -> similarity
+        # Build similarity map: ido_word -> {epo_word -> similarity}, lowercased
+        # here once; each vortaro word then needs a single outer lookup.
+        # Inner dicts are only created for words with at least one pair, so
+        # bert_similarities is empty exactly when there is no BERT data.
         for ido_word, candidates in bert_data.items():
+            epo_similarities = None
             for cand in candidates:
                 epo_word = cand.get('translation', cand.get('epo', ''))
                 similarity = cand.get('similarity', 0)
                 if epo_word:
-                    key = (ido_word.lower(), epo_word.lower())
+                    if epo_similarities is None:
+                        epo_similarities = bert_similarities.setdefault(ido_word.lower(), {})
+                    key = epo_word.lower()
                     # Keep highest similarity
-                    if key not in bert_similarities or similarity > bert_similarities[key]:
-                        bert_similarities[key] = similarity
+                    if key not in epo_similarities or similarity > epo_similarities[key]:
+                        epo_similarities[key] = similarity
         
-        print(f"Loaded {len(bert_similarities)} BERT translation pairs with similarities")
+        num_pairs = sum(len(epo_similarities) for epo_similarities in bert_similarities.values())
+        print(f"Loaded {num_pairs} BERT translation pairs with similarities")
     
     # Filter entries
     removed_words = 0
@@ -66,11 +73,11 @@ def filter_vortaro(input_file: Path, output_file: Path, bert_candidates_file: Pa
         if has_bert:
             # Filter Esperanto words based on similarity
             filtered_epo_words = []
+            epo_similarities = bert_similarities.get(word.lower(), {})
             for epo_word in esperanto_words:
                 # Check similarity if we have BERT data
                 if bert_similarities:
-                    key = (word.lower(), epo_word.lower())
-                    similarity = bert_similarities.get(key, None)
+                    similarity = epo_similarities.get(epo_word.lower(), None)
                     
                     if similarity is not None:
                         if similarity >= min_similarity:
@@ -114,8 +121,7 @@ def filter_vortaro(input_file: Path, output_file: Path, bert_candidates_file: Pa
     
     # Save filtered dictionary
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(filtered_data, f, indent=2, ensure_ascii=False)
+    save_json(filtered_data, output_file)
     
     print(f"\n✅ Saved filtered dictionary to {output_file}")
 
@@ -1,21 +1,30 @@
 #!/usr/bin/env python3
 """
 Query nearest words from trained word embedding models.
-Usage: python3 query_nearest_words.py <model_path> <word> [--topn 10]
+Usage: python3 query_nearest_words.py <model_path> <word> [<word> ...] [--topn 10]
 """
 
 import argparse
+import functools
 from gensim.models import Word2Vec
 import sys
 
-def query_nearest_words(model_path, word, topn=10):
-    """Load model and find nearest words."""
+@functools.lru_cache(maxsize=None)
+def load_model(model_path):
+    """Load a Word2Vec model once per path; later queries reuse it."""
     print(f"Loading model from: {model_path}")
+    # Arrays saved alongside the model (.npy) are memory-mapped read-only
+    # instead of read into memory; queries only read them
+    model = Word2Vec.load(model_path, mmap='r')
+    print(f"✅ Model loaded successfully!")
+    print(f"   Vocabulary size: {len(model.wv)}")
+    print(f"   Vector dimensions: {model.wv.vector_size}")
+    return model
+
+def query_nearest_words(model_path, word, topn=10):
+    """Load model (cached) and find nearest words."""
     try:
-        model = Word2Vec.load(model_path)
-        print(f"✅ Model loaded successfully!")
-        print(f"   Vocabulary size: {len(model.wv)}")
-        print(f"   Vector dimensions: {model.wv.vector_size}")
+        model = load_model(model_path)
         print(f"\n{'='*60}")
         
         # Check if word exists in vocabulary
@@ -56,13 +65,15 @@ def main():
         description='Query nearest words from word embedding models'
     )
     parser.add_argument('model', help='Path to the trained model file')
-    parser.add_argument('word', help='Word to query')
+    parser.add_argument('words', nargs='+',
+                       help='Word(s) to query; the model is loaded once for all of them')
     parser.add_argument('--topn', type=int, default=10, 
                        help='Number of nearest words to return (default: 10)')
     
     args = parser.parse_args()
     
-    query_nearest_words(args.model, args.word, args.topn)
+    for word in args.words:
+        query_nearest_words(args.model, word, args.topn)
 
 if __name__ == '__main__':
     main()
@@ -41,8 +41,10 @@ def find_nearest(embeddings: np.ndarray, vocab: List[str], word_to_idx: Dict[str
     # Compute all similarities
     sims = np.dot(embeddings, query_vec)
     
-    # Get top-k (excluding the query itself)
-    top_indices = np.argsort(sims)[::-1][1:top_k+1]
+    # Get top-k (excluding the query itself): partition out the k+1 best,
+    # then sort only those
+    top_indices = np.argpartition(-sims, min(top_k + 1, len(sims) - 1))[:top_k + 1]
+    top_indices = top_indices[np.argsort(-sims[top_indices])][1:]
     
     return [(vocab[i], float(sims[i])) for i in top_indices]
 
@@ -11,11 +11,11 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from xml.etree import ElementTree as ET
-from xml.dom import minidom
 
 # Import format converters and merger
 from format_converters import load_and_convert_json, detect_format
 from merge_translations import merge_translations_with_stats, print_merge_stats
+from _dix import write_dix_document
 
 # Import bidix generation functions from existing script
 sys.path.insert(0, str(Path(__file__).parent))
@@ -29,7 +29,6 @@ try:
     
     create_dix_entry = format_module.create_dix_entry
     create_dix_document = format_module.create_dix_document
-    prettify_xml = format_module.prettify_xml
     guess_pos_ido = format_module.guess_pos_ido
     guess_pos_esperanto = format_module.guess_pos_esperanto
 except Exception as e:
@@ -62,11 +61,6 @@ except Exception as e:
         for entry in entries:
             section.append(entry)
         return root
-    
-    def prettify_xml(elem):
-        rough_string = ET.tostring(elem, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
 
 
 def generate_bidix_from_merged(merged_data: Dict[str, List[Dict[str, Any]]], 
@@ -272,16 +266,11 @@ def main():
     print(f"{'='*70}")
     
     dix_root = create_dix_document(entries, direction='ido-epo')
-    xml_string = prettify_xml(dix_root)
-    
-    # Add XML declaration
-    xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + '\n'.join(xml_string.split('\n')[1:])
     
     # Ensure output directory exists
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(xml_string)
+    write_dix_document(dix_root, output_file)
     
     print(f"\n✅ Saved bidix to: {output_file}")
     print(f"\n{'='*70}")
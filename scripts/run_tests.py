@@ -10,7 +10,8 @@ from pathlib import Path
 TEST_FILES = [
     "test_format_converters.py",
     "test_merge_translations.py",
-    "test_regeneration_pipeline.py"
+    "test_regeneration_pipeline.py",
+    "test_accelerated_search.py"
 ]
 
 
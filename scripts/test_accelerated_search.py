@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test the accelerated paths of align_bert_with_esperanto.py against plain numpy.
+
+Each check runs on a tiny random matrix and is skipped when its optional
+dependency (numba, faiss, simsimd, cupy) is not installed. Runs under pytest
+or directly as a script.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import align_bert_with_esperanto as abe
+
+TOP_K = 5
+THRESHOLD = 0.1
+# float32 kernels (faiss, simsimd) vs the float64 reference
+ATOL = 1e-4
+
+
+def _random_embeddings(seed=0, n_ido=30, n_epo=80, dim=16):
+    rng = np.random.default_rng(seed)
+    ido = rng.standard_normal((n_ido, dim)).astype(np.float32)
+    epo = rng.standard_normal((n_epo, dim)).astype(np.float32)
+    ido_vocab = [f"ido{i}" for i in range(n_ido)]
+    epo_vocab = [f"epo{i}" for i in range(n_epo)]
+    return ido, ido_vocab, epo, epo_vocab
+
+
+def _normalize(matrix):
+    matrix = matrix.astype(np.float64)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _reference_candidates(ido, ido_vocab, epo, epo_vocab, top_k=TOP_K, threshold=THRESHOLD):
+    """Exact top-k cosine neighbours reaching threshold, with plain numpy."""
+    sims = _normalize(ido) @ _normalize(epo).T
+    order = np.argsort(-sims, axis=1, kind='stable')[:, :top_k]
+    candidates = {}
+    for j, word in enumerate(ido_vocab):
+        row = [(epo_vocab[i], sims[j, i]) for i in order[j] if sims[j, i] >= threshold]
+        if row:
+            candidates[word] = row
+    return candidates
+
+
+def _assert_same_candidates(result, expected):
+    """Same words and top-k translations in the same order, scores within ATOL."""
+    assert list(result) == list(expected), "Different Ido words have candidates"
+    for word, translations in result.items():
+        got = [t['translation'] for t in translations]
+        want = [epo for epo, _ in expected[word]]
+        assert got == want, f"{word}: {got} != {want}"
+        np.testing.assert_allclose(
+            [t['similarity'] for t in translations],
+            [sim for _, sim in expected[word]],
+            atol=ATOL
+        )
+
+
+def _search(**kwargs):
+    ido, ido_vocab, epo, epo_vocab = _random_embeddings()
+    result = abe.find_translation_candidates(
+        ido, ido_vocab, epo, epo_vocab,
+        threshold=THRESHOLD, top_k=TOP_K, batch_size=7, **kwargs
+    )
+    return result, _reference_candidates(ido, ido_vocab, epo, epo_vocab)
+
+
+def _require(module, name):
+    if module is None:
+        raise unittest.SkipTest(f"{name} not installed")
+
+
+def _random_pairs(seed=1, n_ido=12, n_epo=15, n_pairs=40):
+    """Seed pairs with repeated rows on both sides, as (ido ids, epo ids)."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n_ido, n_pairs), rng.integers(0, n_epo, n_pairs)
+
+
+def _sequential_blend(target, source, target_ids, source_ids, alpha):
+    """The per-pair retrofitting update, one pair at a time."""
+    target = target.copy()
+    for t, s in zip(target_ids, source_ids):
+        target[t] = (1 - alpha) * target[t] + alpha * source[s]
+    return target
+
+
+def test_update_rounds():
+    """Applying _update_rounds round by round equals the sequential updates."""
+    ido_ids, epo_ids = _random_pairs()
+    ido, _, epo, _ = _random_embeddings(n_ido=12, n_epo=15)
+    alpha = 0.5
+
+    blended = ido.copy()
+    for sel in abe._update_rounds(ido_ids):
+        ido_i, epo_i = ido_ids[sel], epo_ids[sel]
+        blended[ido_i] = (1 - alpha) * blended[ido_i] + alpha * epo[epo_i]
+
+    np.testing.assert_allclose(blended, _sequential_blend(ido, epo, ido_ids, epo_ids, alpha), rtol=1e-6)
+    print("✅ _update_rounds matches the sequential updates")
+
+
+def test_blend_rows_numba():
+    """The numba _blend_rows kernel equals the sequential updates."""
+    _require(abe.njit, "numba")
+    ido_ids, epo_ids = _random_pairs()
+    ido, _, epo, _ = _random_embeddings(n_ido=12, n_epo=15)
+    alpha = 0.5
+
+    blended = ido.copy()
+    order, ptr = abe._group_by_row(ido_ids)
+    abe._blend_rows(blended, epo, ido_ids[order], epo_ids[order], ptr,
+                    blended.dtype.type(1 - alpha), blended.dtype.type(alpha))
+
+    np.testing.assert_allclose(blended, _sequential_blend(ido, epo, ido_ids, epo_ids, alpha), rtol=1e-6)
+    print("✅ numba _blend_rows matches the sequential updates")
+
+
+def test_topk_threshold_numba():
+    """The numba single-pass top-k equals argsort top-k after thresholding."""
+    _require(abe.njit, "numba")
+    ido, _, epo, _ = _random_embeddings()
+    sims = (_normalize(ido) @ _normalize(epo).T).astype(np.float32)
+
+    got_idx, got_val = abe.top_k_above(sims, TOP_K, THRESHOLD)
+    want_idx, want_val = abe.top_k_rows(sims, TOP_K)
+
+    keep = want_val >= THRESHOLD
+    assert np.array_equal(got_val >= THRESHOLD, keep)
+    assert np.array_equal(got_idx[keep], want_idx[keep])
+    np.testing.assert_allclose(got_val[keep], want_val[keep])
+    assert (got_idx[~keep] == -1).all()
+    print("✅ numba _topk_threshold matches numpy top-k")
+
+
+def test_numpy_search():
+    """The default numpy search equals the reference."""
+    _assert_same_candidates(*_search())
+    print("✅ numpy search matches the reference")
+
+
+def test_parallel_search():
+    """iter_candidates_parallel (process pool) equals the reference."""
+    _assert_same_candidates(*_search(workers=2))
+    print("✅ parallel search matches the reference")
+
+
+def test_faiss_search():
+    """Exact FAISS flat-index search equals the reference."""
+    _require(abe.faiss, "faiss")
+    _assert_same_candidates(*_search(search='faiss'))
+    print("✅ faiss search matches the reference")
+
+
+def test_faiss_hnsw_search():
+    """HNSW search is exact on a vocabulary this small."""
+    _require(abe.faiss, "faiss")
+    _assert_same_candidates(*_search(search='faiss-hnsw'))
+    print("✅ faiss-hnsw search matches the reference")
+
+
+def test_simsimd_search():
+    """SimSIMD cosine search equals the reference."""
+    _require(abe.simsimd, "simsimd")
+    _assert_same_candidates(*_search(search='simsimd'))
+    print("✅ simsimd search matches the reference")
+
+
+def test_int8_search():
+    """The int8 shortlist, rescored with float vectors, equals the reference."""
+    _require(abe.simsimd, "simsimd")
+    _assert_same_candidates(*_search(int8_search=True))
+    print("✅ int8 search matches the reference")
+
+
+def test_cupy_search():
+    """The CuPy numpy search on the GPU equals the reference."""
+    _require(abe.cp, "cupy")
+    _assert_same_candidates(*_search(device='cuda'))
+    print("✅ cupy search matches the reference")
+
+
+if __name__ == "__main__":
+    print("Testing accelerated search paths...")
+    print("=" * 60)
+
+    tests = [
+        test_update_rounds,
+        test_blend_rows_numba,
+        test_topk_threshold_numba,
+        test_numpy_search,
+        test_parallel_search,
+        test_faiss_search,
+        test_faiss_hnsw_search,
+        test_simsimd_search,
+        test_int8_search,
+        test_cupy_search,
+    ]
+    for test in tests:
+        try:
+            test()
+        except unittest.SkipTest as e:
+            print(f"⏭️  {test.__name__} skipped: {e}")
+
+    print("=" * 60)
+    print("✅ All accelerated search tests passed!")